@@ -1,6 +1,3 @@
-import ply.lex as lex
-import ply.yacc as yacc
-
 # tokens
 tokens = ('CHARACTER', 'CONCAT', 'UNION', 'STAR', 'OPTIONAL', 'LPAREN', 'RPAREN')
 
@@ -25,8 +22,15 @@ precedence = (
     ('left', 'STAR', 'OPTIONAL')
 )
 
-# Build the lexer
-lexer = lex.lex()
+# Build the lexer the first time it is needed instead of at import time
+_lexer = None
+
+def get_lexer():
+    global _lexer
+    if _lexer is None:
+        import ply.lex as lex
+        _lexer = lex.lex(optimize=True, lextab='HW1_part2_lextab.pickle')
+    return _lexer
 
 # regular experession AST class
 class RE_AST:
@@ -160,7 +164,24 @@ def derivative_re(char, re):
             return derivative_re(char, re.operands[0])
     return RE_EmptySet()
 
-parser = yacc.yacc()
+# Same for the parser. match_regex() below has to stay as it is, so parser is
+# a stand-in that builds the real one on the first parse() call. It also hands
+# our own lexer to ply instead of whichever lexer happened to be built last.
+_parser = None
+
+def get_parser():
+    global _parser
+    if _parser is None:
+        import ply.yacc as yacc
+        _parser = yacc.yacc(tabfile='HW1_part2_parsetab.pickle', fold_unit_rules=True, optimize=True)
+    return _parser
+
+class _LazyParser:
+    def parse(self, input=None, lexer=None, **kwargs):
+        kwargs.setdefault('fast', True)
+        return get_parser().parse(input, lexer=lexer or get_lexer(), **kwargs)
+
+parser = _LazyParser()
 
 # High-level function to match a string using regular experession
 # derivatives:
@@ -0,0 +1,145 @@
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import dev
+from xmlwriter import DEFAULT_INDENT
+
+# Batch conversion of many JSON files.
+#
+# The inputs can be directories (every *.json file below them), glob patterns,
+# single files or a manifest file listing one path per line. Each input gets
+# its own XML file: next to the input by default, or under --outdir with the
+# same layout relative to the common directory of all the inputs.
+#
+# The files are spread over a ProcessPoolExecutor. Every worker builds the
+# lexer and parser once when it starts (dev.get_lexer()/get_parser() keep them
+# for the rest of the process) and then converts its share of the files.
+
+JSON_PATTERN = '*.json'
+
+# Expand directories, globs and plain paths into a list of JSON files
+def collectInputs(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            found = glob.glob(os.path.join(glob.escape(path), '**', JSON_PATTERN), recursive=True)
+        elif glob.has_magic(path):
+            found = glob.glob(path, recursive=True)
+        else:
+            found = [path]
+        files.extend(sorted(found))
+    # The same file can be matched by more than one argument
+    return list(dict.fromkeys(os.path.normpath(f) for f in files))
+
+# One path per line; blank lines and lines starting with # are skipped.
+# Relative paths are relative to the manifest itself.
+def readManifest(manifest):
+    base = os.path.dirname(manifest)
+    paths = []
+    with open(manifest) as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                paths.append(os.path.join(base, line))
+    return paths
+
+def outputPath(inPath, outdir, root):
+    stem = os.path.splitext(inPath)[0]
+    if outdir is None:
+        return stem + '.xml'
+    return os.path.join(outdir, os.path.relpath(stem, root) + '.xml')
+
+def _initWorker():
+    dev.get_lexer()
+    dev.get_parser()
+
+# Runs in the worker. Returns (inPath, outPath, error, bytesIn, bytesOut, seconds)
+def _convertOne(job):
+    inPath, outPath, flag, indent, stream, threePass, useMmap = job
+    start = time.perf_counter()
+    try:
+        os.makedirs(os.path.dirname(outPath) or '.', exist_ok=True)
+        dev.convertFile(inPath, outPath, flag, indent, stream, threePass, useMmap)
+        error = None
+        bytesOut = os.path.getsize(outPath)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        bytesOut = 0
+    try:
+        bytesIn = os.path.getsize(inPath)
+    except OSError:
+        bytesIn = 0
+    return inPath, outPath, error, bytesIn, bytesOut, time.perf_counter() - start
+
+# Converts every input file and yields the result tuples of _convertOne in
+# input order as they become available
+def convertMany(files, flag, indent=DEFAULT_INDENT, outdir=None, workers=None,
+                stream=False, threePass=False, useMmap=False):
+    if not files:
+        return
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files])
+    jobs = [(f, outputPath(os.path.abspath(f) if outdir else f, outdir, root), flag, indent, stream, threePass, useMmap)
+            for f in files]
+
+    if workers == 1:
+        _initWorker()
+        yield from map(_convertOne, jobs)
+        return
+
+    workers = workers or os.cpu_count() or 1
+    # Hand the files out in chunks so that lots of small files do not cost a
+    # round trip to the pool each
+    chunksize = max(1, min(64, len(jobs) // (workers * 4)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_initWorker) as pool:
+        yield from pool.map(_convertOne, jobs, chunksize=chunksize)
+
+if __name__ == "__main__":
+    import argparse
+    parsa = argparse.ArgumentParser(prog='JSON Tree Parser (batch)')
+    parsa.add_argument('inputs', nargs='*', help='JSON files, directories or glob patterns')
+    parsa.add_argument('-m', '--manifest', action='append', default=[], help='File listing one input path per line')
+    parsa.add_argument('-o', '--outdir', help='Write the XML files here instead of next to the inputs')
+    parsa.add_argument('-j', '--jobs', type=int, help='Number of worker processes (default: one per CPU)')
+    parsa.add_argument('-d', '--duplicateflag', help='True if first occurence has to be retained/False if last occurence has to be retained ')
+    parsa.add_argument('-s', '--stream', action='store_true', help='Convert while reading the input, without building the whole tree in memory')
+    parsa.add_argument('-i', '--indent', type=int, help='Indent the XML with this many spaces instead of a tab')
+    parsa.add_argument('-c', '--compact', action='store_true', help='Write the XML on a single line without indentation')
+    parsa.add_argument('--mmap', action='store_true', help='Map the input files into memory and tokenize their bytes instead of reading them into strings')
+    parsa.add_argument('--three-pass', action='store_true', help='Run labelDuplicates, makeDecision and convertToXML as separate passes instead of the single pass converter')
+    parsa.add_argument('-q', '--quiet', action='store_true', help='Only report the files that failed')
+    args = parsa.parse_args()
+    flag = True if args.duplicateflag == "True" else False
+    if args.compact:
+        indent = None
+    elif args.indent is not None:
+        indent = ' ' * args.indent
+    else:
+        indent = DEFAULT_INDENT
+
+    paths = list(args.inputs)
+    for manifest in args.manifest:
+        paths.extend(readManifest(manifest))
+    files = collectInputs(paths)
+    if not files:
+        parsa.error('no input files')
+
+    failed = 0
+    totalIn = totalOut = 0
+    start = time.perf_counter()
+    for inPath, outPath, error, bytesIn, bytesOut, seconds in convertMany(
+            files, flag, indent, args.outdir, args.jobs, args.stream, args.three_pass, args.mmap):
+        totalIn += bytesIn
+        totalOut += bytesOut
+        if error is None:
+            if not args.quiet:
+                print(f"ok    {inPath} -> {outPath} ({seconds * 1000:.1f} ms)")
+        else:
+            failed += 1
+            print(f"FAIL  {inPath}: {error}")
+    elapsed = time.perf_counter() - start
+
+    mb = 1024 * 1024
+    print(f"{len(files) - failed} of {len(files)} files converted, {failed} failed, in {elapsed:.2f} s")
+    print(f"{len(files) / elapsed:.1f} files/s, {totalIn / mb / elapsed:.2f} MB/s read, {totalOut / mb / elapsed:.2f} MB/s written")
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,58 @@
+# Benchmark for tokenizing a whole document into arrays (jsonlex.tokenizeAll)
+# against producing one token object at a time (jsonlex.JSONLexer), and for
+# parsing from those arrays.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_bulk.py [members]
+#
+# The memory column is what it takes to hold all the tokens of the document
+# at once: a list of token objects against the three arrays.
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+from jsonlex import JSONLexer, TokenArrayLexer, tokenizeAll
+from corpus import recordArray, wideArray, stringHeavy, pretty
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+def tokenList(text):
+    lexer = JSONLexer(dev.t_error)
+    lexer.input(text)
+    return list(lexer)
+
+def allocated(func, text):
+    tracemalloc.start()
+    result = func(text)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    docs = [("records", recordArray(n)),
+            ("records, indented", pretty(recordArray(n), 8)),
+            ("wide array", wideArray(n * 5)),
+            ("string heavy", stringHeavy(n))]
+    print(f"{'document':>18} {'tokens':>8} {'objects (tok/s)':>16} {'arrays (tok/s)':>15} "
+          f"{'objects (B/tok)':>16} {'arrays (B/tok)':>15} {'parse (s)':>10} {'bulk parse (s)':>15}")
+    for name, text in docs:
+        objectTime, tokens = min(timed(tokenList, text) for _ in range(3))
+        arrayTime, arrays = min(timed(tokenizeAll, text) for _ in range(3))
+        count = len(arrays)
+        assert [(t.type, t.value) for t in tokens] == [(t.type, t.value) for t in TokenArrayLexer(arrays)]
+        del tokens, arrays
+        objectBytes = allocated(tokenList, text)
+        arrayBytes = allocated(tokenizeAll, text)
+        parseTime, _ = timed(dev.parse_json, text)
+        bulkTime, _ = timed(dev.parse_json, text, True)
+        print(f"{name:>18} {count:8d} {count / objectTime:16.0f} {count / arrayTime:15.0f} "
+              f"{objectBytes / count:16.1f} {arrayBytes / count:15.1f} {parseTime:10.2f} {bulkTime:15.2f}")
@@ -0,0 +1,53 @@
+# Benchmark for labelDuplicates on wide arrays.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_dedup.py
+#
+# The time per element stays flat as the array grows, while the old
+# list-based version grows linearly per element (quadratic overall).
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dev import TreeNode, labelDuplicates, OBJECT, PAIR, ARRAY, PRIMITIVE
+
+# labelDuplicates as it was before it used a set
+def labelDuplicatesList(node, reversedFlag):
+    if node.type == OBJECT or node.type == ARRAY:
+        valueList = []
+        order = range(len(node.children)) if reversedFlag else range(len(node.children)-1, -1, -1)
+        for i in order:
+            if node.children[i].type != OBJECT:
+                if node.children[i].value not in valueList:
+                    valueList.append(node.children[i].value)
+                else:
+                    if node.removeChildren is None:
+                        node.removeChildren = []
+                    node.removeChildren.append(i)
+            labelDuplicatesList(node.children[i], reversedFlag)
+    elif node.type == PAIR:
+        labelDuplicatesList(node.children[0], reversedFlag)
+
+# An array of n primitives where every value appears twice
+def makeArray(n):
+    return TreeNode(ARRAY, None, [TreeNode(PRIMITIVE, str(i % (n // 2))) for i in range(n)])
+
+def timeIt(func, n, flag):
+    node = makeArray(n)
+    start = time.perf_counter()
+    func(node, flag)
+    return time.perf_counter() - start
+
+if __name__ == "__main__":
+    print(f"{'n':>10} {'flag':>6} {'set (s)':>10} {'ns/elem':>8} {'list (s)':>10} {'ns/elem':>8}")
+    for n in (1000, 4000, 16000, 64000, 256000, 1024000):
+        for flag in (True, False):
+            new = timeIt(labelDuplicates, n, flag)
+            if n <= 16000:
+                old = timeIt(labelDuplicatesList, n, flag)
+                oldColumns = f"{old:10.4f} {old / n * 1e9:8.0f}"
+            else:
+                oldColumns = f"{'-':>10} {'-':>8}"
+            print(f"{n:10d} {str(flag):>6} {new:10.4f} {new / n * 1e9:8.0f} {oldColumns}")
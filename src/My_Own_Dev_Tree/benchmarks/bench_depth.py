@@ -0,0 +1,57 @@
+# Benchmark for the tree walkers on deeply nested documents.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_depth.py [maxDepth]
+#
+# The trees are built directly out of TreeNodes ({"a": {"a": ... 1 ...}})
+# so that only the walkers are timed. The XML is written in compact form
+# and thrown away, since indenting it would be quadratic in the depth.
+# print_tree has the same problem with its indentation, so it is only run
+# up to a depth of 10000.
+
+import contextlib
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dev import TreeNode, labelDuplicates, makeDecision, build_tree, print_tree, convertDocument
+from xmlwriter import CallbackWriter
+
+def deepTree(depth):
+    node = TreeNode("primitive", "1")
+    for _ in range(depth):
+        node = TreeNode("object", None, [TreeNode("pair", "a", [node])])
+    return node
+
+def timeIt(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def discard(chunk):
+    pass
+
+if __name__ == "__main__":
+    maxDepth = int(float(sys.argv[1])) if len(sys.argv) > 1 else 10 ** 6
+    walkers = [
+        ("labelDuplicates", lambda tree: labelDuplicates(tree, True)),
+        ("makeDecision", makeDecision),
+        ("build_tree", build_tree),
+        ("convertToXML", lambda tree: convertDocument(tree, CallbackWriter(discard), None)),
+        ("convertToXMLFused", lambda tree: convertDocument(tree, CallbackWriter(discard), None, False)),
+    ]
+    print(f"{'depth':>9} " + ' '.join(f"{name:>17}" for name, _ in walkers) + f" {'print_tree':>11}")
+    depth = 100
+    while depth <= maxDepth:
+        tree = deepTree(depth)
+        times = [timeIt(lambda: walker(tree)) for _, walker in walkers]
+        if depth <= 10 ** 4:
+            with contextlib.redirect_stdout(io.StringIO()):
+                printTime = f"{timeIt(lambda: print_tree(tree)):11.3f}"
+        else:
+            printTime = f"{'-':>11}"
+        print(f"{depth:9d} " + ' '.join(f"{t:17.3f}" for t in times) + f" {printTime}")
+        depth *= 10
+    print(f"(recursion limit: {sys.getrecursionlimit()})")
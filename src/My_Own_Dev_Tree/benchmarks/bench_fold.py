@@ -0,0 +1,54 @@
+# Parse throughput and number of rule function calls with and without
+# yacc(fold_unit_rules=True), which folds the pass-through chain rules
+# (json : object, element : primitive | object | array) out of the tables.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_fold.py [members]
+#
+# Tokens are replayed as in bench_parse.py, and both parsers use the fast
+# parse loop.
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+import ply.yacc as yacc
+from jsonlex import JSONLexer
+from corpus import recordArray, wideArray, deepObject, stringHeavy
+from bench_parse import ReplayLexer, lexAll, timeParse, dump
+
+# Number of rule functions called while parsing
+def countCalls(parser, tokens):
+    calls = [0]
+    saved = []
+    for prod in parser.productions:
+        if prod.callable:
+            def counted(p, func=prod.callable):
+                calls[0] += 1
+                func(p)
+            saved.append((prod, prod.callable))
+            prod.callable = counted
+    parser.fast_tables = None
+    try:
+        parser.parse(lexer=ReplayLexer(tokens), fast=True)
+    finally:
+        for prod, func in saved:
+            prod.callable = func
+        parser.fast_tables = None
+    return calls[0]
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    docs = [("records", recordArray(n)), ("wide array", wideArray(n * 5)),
+            ("deep object", deepObject(2000)), ("string heavy", stringHeavy(n))]
+    plain = yacc.yacc(module=dev)
+    folded = dev.get_parser()
+    print(f"{'document':>14} {'tokens':>8} {'calls':>8} {'folded calls':>13} {'tok/s':>9} {'folded tok/s':>13} {'speedup':>8}")
+    for name, text in docs:
+        tokens = lexAll(JSONLexer(dev.t_error), text)
+        plainTime, tree = timeParse(plain, tokens, True)
+        foldedTime, foldedTree = timeParse(folded, tokens, True)
+        assert dump(tree) == dump(foldedTree)
+        print(f"{name:>14} {len(tokens):8d} {countCalls(plain, tokens):8d} {countCalls(folded, tokens):13d} "
+              f"{len(tokens) / plainTime:9.0f} {len(tokens) / foldedTime:13.0f} {plainTime / foldedTime:8.2f}")
@@ -0,0 +1,45 @@
+# Benchmark for the single pass converter against the three pass one
+# (labelDuplicates, makeDecision, convertToXML).
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_fused.py [members]
+#
+# Parsing is not timed, and both outputs are checked to be identical.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dev import parse_json, labelDuplicates, makeDecision, convertDocument
+from xmlwriter import StringWriter
+from corpus import recordArray, wideArray
+
+def threePass(ast, flag):
+    writer = StringWriter()
+    labelDuplicates(ast, flag)
+    makeDecision(ast)
+    convertDocument(ast, writer)
+    return writer.getvalue()
+
+def fused(ast, flag):
+    writer = StringWriter()
+    convertDocument(ast, writer, reversedFlag=flag)
+    return writer.getvalue()
+
+def timeIt(func, text, flag):
+    ast = parse_json(text)
+    start = time.perf_counter()
+    xml = func(ast, flag)
+    return time.perf_counter() - start, xml
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    docs = [("records", recordArray(n)), ("wide array", wideArray(n * 2))]
+    print(f"{'document':>12} {'flag':>6} {'three pass (s)':>15} {'single pass (s)':>16} {'speedup':>8}")
+    for name, text in docs:
+        for flag in (True, False):
+            old, oldXML = timeIt(threePass, text, flag)
+            new, newXML = timeIt(fused, text, flag)
+            assert oldXML == newXML, "outputs differ"
+            print(f"{name:>12} {str(flag):>6} {old:15.3f} {new:16.3f} {old / new:8.2f}")
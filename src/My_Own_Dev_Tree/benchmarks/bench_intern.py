@@ -0,0 +1,79 @@
+# Memory of the parsed tree with keys and small primitive values interned per
+# document (dev.internValue) against every node holding its own str.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_intern.py [members]
+#
+# Interning is turned off by taking the interned table away from the lexer
+# after input(). "tree" is what the parsed tree keeps alive, measured with
+# tracemalloc and not counting the input, and "strs" the number of distinct
+# value objects in it. "convert" is the time for the single pass converter
+# (duplicate checks included) on the parsed tree; both ways are checked to
+# give the same XML. "wide" has only string values, which are not interned,
+# so it should come out the same both ways.
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+from jsonlex import JSONLexer
+from xmlwriter import StringWriter
+from corpus import recordArray, wideArray
+
+def parse(text, intern):
+    lexer = JSONLexer(dev.t_error)
+    lexer.input(text)
+    if not intern:
+        lexer.interned = None
+    return dev.get_parser().parse(lexer=lexer, fast=True)
+
+def distinctValues(ast):
+    seen = set()
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        if node.value is not None:
+            seen.add(id(node.value))
+        stack.extend(node.children)
+    return len(seen)
+
+def treeMemory(text, intern):
+    gc.collect()
+    tracemalloc.start()
+    tree = parse(text, intern)
+    current = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return tree, current
+
+def convertTime(tree, repeat=3):
+    best = None
+    for _ in range(repeat):
+        writer = StringWriter()
+        start = time.perf_counter()
+        dev.convertDocument(tree, writer, reversedFlag=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, writer.getvalue()
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    dev.get_parser()
+    docs = [("records", recordArray(n)), ("records x5", recordArray(5 * n)),
+            ("wide", wideArray(10 * n, dupFactor=4))]
+    mb = 1024 * 1024
+    print(f"{'document':>12} {'MB':>6} {'tree plain':>11} {'tree intern':>12} {'saved':>6} "
+          f"{'strs plain':>11} {'strs intern':>12} {'convert plain':>14} {'convert intern':>15}")
+    for name, text in docs:
+        plainTree, plainMem = treeMemory(text, False)
+        internTree, internMem = treeMemory(text, True)
+        plainTime, plainXML = convertTime(plainTree)
+        internTime, internXML = convertTime(internTree)
+        assert plainXML == internXML
+        print(f"{name:>12} {len(text) / mb:6.1f} {plainMem / mb:11.1f} {internMem / mb:12.1f} "
+              f"{1 - internMem / plainMem:6.0%} {distinctValues(plainTree):11d} {distinctValues(internTree):12d} "
+              f"{plainTime:13.3f}s {internTime:14.3f}s")
+        del plainTree, internTree
@@ -0,0 +1,46 @@
+# Benchmark for the JSON specific lexer (jsonlex.JSONLexer) against the
+# generic ply.lex one, in tokens per second.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_lexer.py [members]
+#
+# Both lexers are checked to produce the same tokens.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+from jsonlex import JSONLexer
+from corpus import recordArray, wideArray, deepObject, stringHeavy, pretty
+
+def tokenize(lexer, text):
+    lexer.input(text)
+    token = lexer.token
+    count = 0
+    start = time.perf_counter()
+    while token() is not None:
+        count += 1
+    return count, time.perf_counter() - start
+
+def tokenList(lexer, text):
+    lexer.input(text)
+    return [(t.type, t.value, t.lexpos) for t in lexer]
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    docs = [("records", recordArray(n)),
+            ("records, indented", pretty(recordArray(n), 8)),
+            ("wide array", wideArray(n * 5)),
+            ("deep, indented", pretty(deepObject(500), 4)),
+            ("string heavy", stringHeavy(n))]
+    plyLexer = dev.get_ply_lexer()
+    jsonLexer = JSONLexer(dev.t_error)
+    print(f"{'document':>18} {'MB':>6} {'tokens':>9} {'ply (tok/s)':>12} {'jsonlex (tok/s)':>16} {'speedup':>8}")
+    for name, text in docs:
+        assert tokenList(plyLexer, text) == tokenList(jsonLexer, text)
+        count, plyTime = min(tokenize(plyLexer, text) for _ in range(3))
+        count, jsonTime = min(tokenize(jsonLexer, text) for _ in range(3))
+        print(f"{name:>18} {len(text) / 1e6:6.2f} {count:9d} {count / plyTime:12.0f} {count / jsonTime:16.0f} "
+              f"{plyTime / jsonTime:8.2f}")
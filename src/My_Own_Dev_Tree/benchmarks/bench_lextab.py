@@ -0,0 +1,67 @@
+# Cold start of lex.lex() for lexers with more and more token rules: building
+# the master regular expressions from the rules, against restoring them from
+# the lextab file, with and without optimize=True (which also skips
+# validating the rules).
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_lextab.py [runs]
+#
+# The rules are made up keyword tokens plus a couple of function rules. Each
+# measurement is made in a new Python process and the times are medians over
+# the runs, in milliseconds.
+
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def grammarSource(nrules):
+    names = ['KW%d' % i for i in range(nrules)]
+    lines = ["tokens = %r + ['NUMBER', 'NAME']" % names,
+             "t_ignore = ' \\t\\n'",
+             "def t_NUMBER(t):",
+             "    r'\\d+'",
+             "    return t",
+             "def t_error(t):",
+             "    t.lexer.skip(1)",
+             "t_NAME = r'[A-Za-z_][A-Za-z_0-9]*_'"]
+    lines += ["t_%s = r'kw%d\\b'" % (name, i) for i, name in enumerate(names)]
+    return '\n'.join(lines) + '\n'
+
+SNIPPET = r'''
+import sys, time
+sys.path.insert(0, %(here)r)
+sys.path.insert(0, %(tmpdir)r)
+import ply.lex as lex
+import rules
+start = time.perf_counter()
+lexer = lex.lex(module=rules, optimize=%(optimize)r, lextab=%(lextab)r, outputdir=%(tmpdir)r)
+elapsed = time.perf_counter() - start
+lexer.input('kw0 12 kw1 name_')
+assert [t.type for t in lexer] == ['KW0', 'NUMBER', 'KW1', 'NAME']
+print(elapsed)
+'''
+
+def lexTime(tmpdir, lextab, optimize, runs):
+    code = SNIPPET % {'here': HERE, 'tmpdir': tmpdir, 'lextab': lextab, 'optimize': optimize}
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples) * 1000
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 7
+    print(f"{'rules':>6} {'build':>9} {'lextab':>9} {'lextab+optimize':>16}")
+    for nrules in (10, 50, 200, 800):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            with open(os.path.join(tmpdir, 'rules.py'), 'w') as f:
+                f.write(grammarSource(nrules))
+            build = lexTime(tmpdir, None, False, runs)
+            lexTime(tmpdir, 'lextab.pickle', False, 1)
+            restored = lexTime(tmpdir, 'lextab.pickle', False, runs)
+            optimized = lexTime(tmpdir, 'lextab.pickle', True, runs)
+        print(f"{nrules:6d} {build:9.2f} {restored:9.2f} {optimized:16.2f}")
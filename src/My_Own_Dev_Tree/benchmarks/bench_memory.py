@@ -0,0 +1,89 @@
+# Memory benchmark for the TreeNode layout.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_memory.py [members]
+#
+# The AST of a record array is copied into the current TreeNode and into the
+# old __dict__ based class, while tracemalloc counts what each copy keeps
+# alive. Both copies share the same value strings, so the numbers are the
+# cost of the nodes themselves.
+
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from dev import TreeNode, TYPE_NAMES, NO_CHILDREN, PAIR, parse_json
+from corpus import recordArray
+
+# TreeNode as it was before it used __slots__
+class LegacyTreeNode:
+    def __init__(self, type, value=None, children=None):
+        self.type = type
+        self.value = value
+        self.isDuplicate = False
+        if type == 'array' or type == 'object':
+            self.removeChildren = []
+        self.children = children if children is not None else []
+
+def countNodes(ast):
+    count = 0
+    stack = [ast]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+# Copies the AST bottom up, the same way the parser builds it
+def copyTree(ast, build):
+    stack = [(ast, False)]
+    done = []
+    while stack:
+        node, visited = stack.pop()
+        if not visited and node.children:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.children))
+            continue
+        children = None
+        if node.children:
+            children = done[len(done) - len(node.children):]
+            del done[len(done) - len(node.children):]
+        done.append(build(node, children))
+    return done[0]
+
+def buildLegacy(node, children):
+    return LegacyTreeNode(TYPE_NAMES[node.type], node.value, children)
+
+def buildCurrent(node, children):
+    copy = TreeNode.__new__(TreeNode)
+    copy.type = node.type
+    copy.value = node.value
+    copy.removeChildren = None
+    if children is None:
+        copy.children = NO_CHILDREN
+    elif node.type == PAIR:
+        copy.children = tuple(children)
+    else:
+        copy.children = children
+    return copy
+
+def measure(ast, build):
+    tracemalloc.start()
+    copy = copyTree(ast, build)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size, copy
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    text = recordArray(n)
+    ast = parse_json(text)
+    nodes = countNodes(ast)
+    legacy, _ = measure(ast, buildLegacy)
+    current, _ = measure(ast, buildCurrent)
+    print(f"input: {len(text)} characters, {nodes} nodes")
+    print(f"{'class':>16} {'bytes':>12} {'bytes/node':>11}")
+    print(f"{'LegacyTreeNode':>16} {legacy:12d} {legacy / nodes:11.1f}")
+    print(f"{'TreeNode':>16} {current:12d} {current / nodes:11.1f}")
+    print(f"saving: {100 * (1 - current / legacy):.0f}%")
@@ -0,0 +1,56 @@
+# Peak memory and time of parsing a JSON file read into a str against parsing
+# it through mmap (dev.parse_json_file).
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_mmap.py [members]
+#
+# Peak memory is what tracemalloc sees, so the mapped file itself (which lives
+# in the page cache) is not counted, while the str read from it is.
+
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+from corpus import recordArray, stringHeavy, pretty
+
+def readAndParse(path):
+    with open(path) as f:
+        return dev.parse_json(f.read(), bulk=True)
+
+# The long strings in the AST point into the mapping, which is closed at the
+# end of the with block, so the AST is not returned
+def mapAndParse(path):
+    with dev.parse_json_file(path) as ast:
+        return ast is not None
+
+def measure(func, path):
+    tracemalloc.start()
+    start = time.perf_counter()
+    ast = func(path)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del ast
+    return elapsed, peak
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    docs = [("records", recordArray(n)),
+            ("records, indented", pretty(recordArray(n), 8)),
+            ("string heavy", stringHeavy(n))]
+    dev.get_parser()
+    mb = 1024 * 1024
+    print(f"{'document':>18} {'file (MB)':>10} {'read peak (MB)':>15} {'mmap peak (MB)':>15} {'read (s)':>9} {'mmap (s)':>9}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, text in docs:
+            path = os.path.join(tmp, 'doc.json')
+            with open(path, 'w') as f:
+                f.write(text)
+            readTime, readPeak = measure(readAndParse, path)
+            mmapTime, mmapPeak = measure(mapAndParse, path)
+            print(f"{name:>18} {os.path.getsize(path) / mb:10.2f} {readPeak / mb:15.2f} {mmapPeak / mb:15.2f} "
+                  f"{readTime:9.2f} {mmapTime:9.2f}")
@@ -0,0 +1,56 @@
+# Time to turn the text of the value tokens into node values: the old
+# character by character removeDoubleQuotes, the current one (str.replace)
+# and normalizeValue, which slices the quotes off and only decodes escapes in
+# strings that have a backslash.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_normalize.py [rows]
+#
+# The tokens are every STRING and NUMBER token of the documents, as the lexer
+# gives them. In "escaped" some of the spaces in the strings are \" and \\ so
+# that a part of the tokens has escapes to decode (removeDoubleQuotes doesn't
+# decode them, so it gives a different result for those). Times are the best
+# of a few runs, in milliseconds for all the tokens of a document.
+
+import os
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+from corpus import recordArray, stringHeavy
+
+# removeDoubleQuotes as it was before
+def legacyRemoveDoubleQuotes(string):
+    finalString = ''
+    for i in string:
+        if not (i == "\"" or i == "\'"):
+            finalString += i
+    return finalString
+
+_valueToken = re.compile('%s|%s' % (dev.t_STRING, dev.t_NUMBER))
+
+def bestTime(func, values, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for value in values:
+            func(value)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    escaped = stringHeavy(n).replace(' k', ' \\"k').replace(' m', ' \\\\m')
+    docs = [("records", recordArray(n)), ("strings 80", stringHeavy(n)),
+            ("strings 400", stringHeavy(n // 4, length=400)), ("escaped", escaped)]
+    funcs = [("legacy", legacyRemoveDoubleQuotes), ("replace", dev.removeDoubleQuotes),
+             ("normalize", dev.normalizeValue)]
+    print(f"{'document':>12} {'tokens':>8} {'escapes':>8} " + ' '.join(f'{name:>10}' for name, _ in funcs))
+    for name, text in docs:
+        values = _valueToken.findall(text)
+        withEscapes = sum('\\' in value for value in values)
+        times = [bestTime(func, values) for _, func in funcs]
+        print(f"{name:>12} {len(values):8d} {withEscapes:8d} " + ' '.join(f'{t:10.2f}' for t in times))
@@ -0,0 +1,87 @@
+# Parse throughput of LRParser.parse() against the stripped down loop that
+# parse(fast=True) uses (LRParser.parseopt_notrack).
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_parse.py [members]
+#
+# The documents are tokenized beforehand and the tokens replayed to the
+# parser, so only the parser itself is timed. Both loops are checked to build
+# the same tree.
+
+import gc
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+import HW1_part2
+from jsonlex import JSONLexer
+from corpus import recordArray, wideArray, deepObject, stringHeavy
+
+# Hands out a list of tokens that has already been made
+class ReplayLexer:
+    def __init__(self, tokens):
+        self.lineno = 1
+        self.lexpos = 0
+        self.token = iter(tokens + [None]).__next__
+
+    def input(self, s):
+        pass
+
+def lexAll(lexer, text):
+    lexer.input(text)
+    return list(iter(lexer.token, None))
+
+def timeParse(parser, tokens, fast, repeat=5):
+    best = None
+    for _ in range(repeat):
+        lexer = ReplayLexer(tokens)
+        # Keep the garbage collector out of the timings; it is triggered by
+        # the tree being built rather than by the parser loop
+        result = None
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        result = parser.parse(lexer=lexer, fast=fast)
+        elapsed = time.perf_counter() - start
+        gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+# Flattened tree, for comparing the results of both loops. Works for the
+# TreeNodes of dev.py and the RE_AST nodes of HW1_part2.py.
+def dump(node):
+    stack = [node]
+    out = []
+    while stack:
+        node = stack.pop()
+        children = getattr(node, 'children', None) or getattr(node, 'operands', ())
+        out.append((type(node).__name__, getattr(node, 'type', getattr(node, 'operator', None)),
+                    getattr(node, 'value', None), len(children)))
+        stack.extend(children)
+    return out
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    docs = [("records", recordArray(n)), ("wide array", wideArray(n * 5)),
+            ("deep object", deepObject(2000)), ("string heavy", stringHeavy(n))]
+    parser = dev.get_parser()
+    print(f"{'document':>14} {'tokens':>8} {'parse (tok/s)':>14} {'fast (tok/s)':>13} {'speedup':>8}")
+    for name, text in docs:
+        tokens = lexAll(JSONLexer(dev.t_error), text)
+        slow, tree = timeParse(parser, tokens, False)
+        fast, fastTree = timeParse(parser, tokens, True)
+        assert dump(tree) == dump(fastTree)
+        print(f"{name:>14} {len(tokens):8d} {len(tokens) / slow:14.0f} {len(tokens) / fast:13.0f} {slow / fast:8.2f}")
+
+    # The regular expression grammar from HW1_part2.py, which has precedence
+    # rules and more chain productions
+    parser = HW1_part2.get_parser()
+    lexer = HW1_part2.get_lexer()
+    for name, text in (("regex", '|'.join(['(a.b)*.c?'] * (n // 10))),):
+        tokens = lexAll(lexer, text)
+        slow, tree = timeParse(parser, tokens, False)
+        fast, fastTree = timeParse(parser, tokens, True)
+        assert dump(tree) == dump(fastTree)
+        print(f"{name:>14} {len(tokens):8d} {len(tokens) / slow:14.0f} {len(tokens) / fast:13.0f} {slow / fast:8.2f}")
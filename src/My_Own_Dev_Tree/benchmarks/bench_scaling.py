@@ -0,0 +1,95 @@
+# Parse time and parser stack depth against array length, for the
+# left-recursive members/elements rules in dev.py and for the right-recursive
+# ones they replaced.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_scaling.py [sizes...]
+#
+# The default sizes are 1e5 and 1e6 elements; add 1e7 on the command line if
+# there are a couple of GB of memory to spare. The right-recursive grammar
+# copies the list on every reduction, so it is only run up to LEGACY_LIMIT
+# elements.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+import ply.yacc as yacc
+
+LEGACY_LIMIT = 20000
+
+# dev.py's grammar as it was before, with right-recursive lists
+class LegacyGrammar:
+    tokens = dev.tokens
+    start = 'json'
+    p_json = staticmethod(dev.p_json)
+    p_object = staticmethod(dev.p_object)
+    p_pair = staticmethod(dev.p_pair)
+    p_array = staticmethod(dev.p_array)
+    p_element = staticmethod(dev.p_element)
+    p_primitive = staticmethod(dev.p_primitive)
+    p_error = staticmethod(dev.p_error)
+
+    @staticmethod
+    def p_members(p):
+        '''members : pair
+                   | pair COMMA members'''
+        if len(p) == 2:
+            p[0] = [p[1]]
+        else:
+            p[0] = [p[1]] + p[3]
+
+    @staticmethod
+    def p_elements(p):
+        '''elements : element
+                    | element COMMA elements'''
+        if len(p) == 2:
+            p[0] = [p[1]]
+        else:
+            p[0] = [p[1]] + p[3]
+
+def arrayDocument(n):
+    return '{"values": [%s]}' % ', '.join(str(i % 1000) for i in range(n))
+
+def timeParse(parser, text):
+    lexer = dev.get_lexer()
+    lexer.input(text)
+    start = time.perf_counter()
+    parser.parse(lexer=lexer)
+    return time.perf_counter() - start
+
+# Deepest the symbol stack gets during the parse, seen from the actions
+def maxStackDepth(parser, text):
+    depth = [0]
+    saved = []
+    for prod in parser.productions:
+        if prod.callable:
+            def wrapped(p, func=prod.callable):
+                depth[0] = max(depth[0], len(p.stack))
+                func(p)
+            saved.append((prod, prod.callable))
+            prod.callable = wrapped
+    try:
+        lexer = dev.get_lexer()
+        lexer.input(text)
+        parser.parse(lexer=lexer)
+    finally:
+        for prod, func in saved:
+            prod.callable = func
+    return depth[0]
+
+if __name__ == "__main__":
+    sizes = [int(float(a)) for a in sys.argv[1:]] or [10 ** 5, 10 ** 6]
+    legacy = yacc.yacc(module=LegacyGrammar)
+    current = dev.get_parser()
+    print(f"{'elements':>10} {'grammar':>8} {'parse (s)':>10} {'us/elem':>8} {'max stack':>10}")
+    for n in sorted(set([1000, LEGACY_LIMIT] + sizes)):
+        text = arrayDocument(n)
+        for name, parser in (("right", legacy), ("left", current)):
+            if name == "right" and n > LEGACY_LIMIT:
+                continue
+            elapsed = timeParse(parser, text)
+            depth = maxStackDepth(parser, text)
+            print(f"{n:10d} {name:>8} {elapsed:10.2f} {elapsed / n * 1e6:8.2f} {depth:10d}")
@@ -0,0 +1,63 @@
+# Time to write the XML for arrays of records with and without the record
+# shape templates of dev._writeXML.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_shapes.py [rows]
+#
+# The templates are turned off by setting dev.SHAPE_TEMPLATES_MAX to 0. The
+# trees are parsed once and not timed. "single pass" is the converter that
+# skips duplicates as it writes, "write only" convertToXML on a tree with no
+# duplicates left. "mixed" has records of a few different shapes, some with
+# a repeated key, which are written the generic way. Both ways are checked to
+# give the same XML; times are the best of a few runs.
+
+import os
+import sys
+import time
+import random
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+from xmlwriter import StringWriter
+from corpus import recordArray, wideRecords
+
+def mixedRecords(n, seed=0):
+    rnd = random.Random(seed)
+    shapes = [('id', 'name', 'age'), ('name', 'id', 'age'), ('id', 'name', 'id'), ('id', 'tags')]
+    rows = []
+    for i in range(n):
+        shape = rnd.choice(shapes)
+        rows.append('{%s}' % ', '.join('"%s": %s' % (key, '[1, 2]' if key == 'tags' else i) for key in shape))
+    return '{"rows": [%s]}' % ', '.join(rows)
+
+def convert(ast, reversedFlag):
+    writer = StringWriter()
+    if reversedFlag is None:
+        dev.convertToXML(ast, writer)
+    else:
+        dev.convertDocument(ast, writer, reversedFlag=reversedFlag)
+    return writer.getvalue()
+
+def bestTime(ast, reversedFlag, templates, repeat=5):
+    dev.SHAPE_TEMPLATES_MAX = templates
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        xml = convert(ast, reversedFlag)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, xml
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    templates = dev.SHAPE_TEMPLATES_MAX
+    docs = [("records", recordArray(n)), ("wide 20", wideRecords(n // 2)),
+            ("wide 60", wideRecords(n // 6, width=60)), ("mixed", mixedRecords(n))]
+    print(f"{'document':>10} {'mode':>12} {'generic (s)':>12} {'templates (s)':>14} {'speedup':>8}")
+    for name, text in docs:
+        ast = dev.parse_json(text)
+        for mode, flag in (("single pass", True), ("write only", None)):
+            genericTime, genericXML = bestTime(ast, flag, 0)
+            templateTime, templateXML = bestTime(ast, flag, templates)
+            assert genericXML == templateXML
+            print(f"{name:>10} {mode:>12} {genericTime:12.3f} {templateTime:14.3f} {genericTime / templateTime:7.2f}x")
@@ -0,0 +1,63 @@
+# Memory and time of parsing with long string values left in the source text
+# (jsonlex.StringSpan, used by dev.py for strings of LAZY_STRING_MIN or more
+# characters) against copying every string out of the input.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_spans.py [rows]
+#
+# "tree" is what the parsed tree keeps alive, "peak" the most memory in use
+# while parsing, both measured with tracemalloc and not counting the input
+# itself. "convert" is the time to parse and write the XML with the single
+# pass converter; both ways are checked to give the same XML.
+
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+from jsonlex import JSONLexer
+from xmlwriter import StringWriter
+from corpus import recordArray, stringHeavy
+
+def parse(text, lazy):
+    lexer = JSONLexer(dev.t_error, lazy)
+    lexer.input(text)
+    return dev.get_parser().parse(lexer=lexer, fast=True)
+
+def treeMemory(text, lazy):
+    gc.collect()
+    tracemalloc.start()
+    tree = parse(text, lazy)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return tree, current, peak
+
+def convertTime(text, lazy, repeat=3):
+    best = None
+    for _ in range(repeat):
+        writer = StringWriter()
+        start = time.perf_counter()
+        dev.convertDocument(parse(text, lazy), writer, reversedFlag=True)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, writer.getvalue()
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    dev.get_parser()
+    docs = [("records", recordArray(n)), ("strings 80", stringHeavy(n)),
+            ("strings 400", stringHeavy(n // 4, length=400))]
+    mb = 1024 * 1024
+    print(f"{'document':>12} {'MB':>6} {'tree copy':>10} {'tree span':>10} {'peak copy':>10} {'peak span':>10} "
+          f"{'convert copy':>13} {'convert span':>13}")
+    for name, text in docs:
+        _, copyTree, copyPeak = treeMemory(text, None)
+        _, spanTree, spanPeak = treeMemory(text, dev.LAZY_STRING_MIN)
+        copyTime, copyXML = convertTime(text, None)
+        spanTime, spanXML = convertTime(text, dev.LAZY_STRING_MIN)
+        assert copyXML == spanXML
+        print(f"{name:>12} {len(text) / mb:6.1f} {copyTree / mb:10.1f} {spanTree / mb:10.1f} {copyPeak / mb:10.1f} "
+              f"{spanPeak / mb:10.1f} {copyTime:12.3f}s {spanTime:12.3f}s")
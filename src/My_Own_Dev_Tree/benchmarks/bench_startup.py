@@ -0,0 +1,70 @@
+# Startup cost of the lexer and parser of dev.py and HW1_part2.py, with and
+# without the optimize mode of lex.lex() and yacc.yacc(), which trusts rules
+# whose signature was recorded by an earlier run instead of validating them
+# again (and with it reading the source file to look for redefined rules).
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_startup.py [runs]
+#
+# Every measurement is made in a new Python process, since lex() and yacc()
+# leave nothing behind in the process to make the next call cheaper. The
+# lextab and table cache files are kept in a temporary directory, written by
+# one run beforehand, so both modes load the cached tables. get_parser is the
+# module's own get_parser() as it is shipped, which is the same in both rows.
+# The times are medians over the runs, in milliseconds.
+
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Prints the times of the steps as JSON
+SNIPPET = r'''
+import json, sys, time
+sys.path.insert(0, %(here)r)
+times = {}
+start = time.perf_counter()
+import ply.lex as lex
+import ply.yacc as yacc
+import %(module)s as grammar
+times['import'] = time.perf_counter() - start
+
+start = time.perf_counter()
+lex.lex(module=grammar, optimize=%(optimize)r, lextab='lextab.pickle', outputdir=%(tmpdir)r)
+times['lex'] = time.perf_counter() - start
+
+start = time.perf_counter()
+yacc.yacc(module=grammar, optimize=%(optimize)r, tabfile='parsetab.pickle', outputdir=%(tmpdir)r,
+          fold_unit_rules=True)
+times['yacc'] = time.perf_counter() - start
+
+start = time.perf_counter()
+grammar.get_parser()
+times['get_parser'] = time.perf_counter() - start
+print(json.dumps(times))
+'''
+
+STEPS = ('import', 'lex', 'yacc', 'get_parser')
+
+def startup(module, optimize, tmpdir, runs):
+    code = SNIPPET % {'here': HERE, 'module': module, 'optimize': optimize, 'tmpdir': tmpdir}
+    samples = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True, cwd=HERE)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    return dict((step, statistics.median(s[step] for s in samples) * 1000) for step in STEPS)
+
+if __name__ == "__main__":
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 9
+    print(f"{'module':>11} {'mode':>9} " + ' '.join(f'{step:>10}' for step in STEPS))
+    for module in ('dev', 'HW1_part2'):
+        with tempfile.TemporaryDirectory() as tmpdir:
+            startup(module, False, tmpdir, 1)
+            for optimize in (False, True):
+                times = startup(module, optimize, tmpdir, runs)
+                mode = 'optimize' if optimize else 'validate'
+                print(f"{module:>11} {mode:>9} " + ' '.join(f'{times[step]:10.2f}' for step in STEPS))
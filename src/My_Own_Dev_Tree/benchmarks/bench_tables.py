@@ -0,0 +1,177 @@
+# Size and lookup speed of the LALR tables as dicts (LRParser.action/goto,
+# what the parse loops use) and packed into row displaced integer arrays
+# (CompactLRTables below), for the JSON grammar in dev.py and the regular
+# expression grammar in HW1_part2.py.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_tables.py [members]
+#
+# The lookups are every (state, terminal) pair of the action table, blank
+# entries included, and every filled entry of the goto table; both forms are
+# checked to agree on all of them. The parse throughput is for the fast loop.
+
+import gc
+import os
+import sys
+import time
+from array import array
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+import HW1_part2
+from jsonlex import JSONLexer
+from corpus import recordArray
+from bench_parse import lexAll, timeParse
+
+# The action and goto tables packed into integer arrays. Terminals and
+# nonterminals are numbered, and the rows of each table are overlaid in one
+# array (row displacement): the entry for state s and symbol number c is at
+# index base[s] + c. In the action table check[i] tells which state the entry
+# at i belongs to, so the blank entries of one row can be used by the others,
+# and a token type that isn't a terminal at all gets the number of an extra,
+# always blank column. The goto table needs no check array, since the parser
+# never looks up a goto entry that isn't there.
+#
+# The parse loops used these for a while. A lookup still has to hash the
+# token type to find its column, and the array reads on top made it slower
+# than the dict rows, so only the numbers below are left.
+
+# The smallest array that holds all of values
+def intArray(values):
+    lo = min(values, default=0)
+    hi = max(values, default=0)
+    for code in 'bhil':
+        limit = 1 << (8 * array(code).itemsize - 1)
+        if -limit <= lo and hi < limit:
+            return array(code, values)
+    return array('q', values)
+
+# rows maps each state to a {column: value} dict. Returns the base, check
+# and value arrays.
+def displaceRows(rows, nstates, width):
+    base = [0] * nstates
+    check = []
+    value = []
+    # The fullest rows are the hardest to fit, so they go in first
+    for state in sorted(rows, key=lambda s: (-len(rows[s]), s)):
+        row = rows[state]
+        b = 0
+        while any(b + c < len(check) and check[b + c] != -1 for c in row):
+            b += 1
+        if len(check) < b + width:
+            check.extend([-1] * (b + width - len(check)))
+            value.extend([0] * (b + width - len(value)))
+        for c, v in row.items():
+            check[b + c] = state
+            value[b + c] = v
+        base[state] = b
+    return intArray(base), intArray(check), intArray(value)
+
+class CompactLRTables:
+    def __init__(self, action, goto):
+        self.terminals = sorted(set(t for row in action.values() for t in row) | {'error'})
+        self.term_index = dict((t, i) for i, t in enumerate(self.terminals))
+        self.nonterminals = sorted(set(n for row in goto.values() for n in row))
+        self.nonterm_index = dict((n, i) for i, n in enumerate(self.nonterminals))
+        self.unknown_term = len(self.terminals)
+        nstates = max(list(action) + list(goto)) + 1 if action else 0
+
+        rows = dict((s, dict((self.term_index[t], v) for t, v in row.items())) for s, row in action.items())
+        self.action_base, self.action_check, self.action_value = \
+            displaceRows(rows, nstates, len(self.terminals) + 1)
+        rows = dict((s, dict((self.nonterm_index[n], v) for n, v in row.items())) for s, row in goto.items())
+        self.goto_base, _, self.goto_value = displaceRows(rows, nstates, len(self.nonterminals))
+
+    # Same as action[state].get(tok)
+    def action_get(self, state, tok):
+        i = self.action_base[state] + self.term_index.get(tok, self.unknown_term)
+        return self.action_value[i] if self.action_check[i] == state else None
+
+    # Same as goto[state][name]
+    def goto_get(self, state, name):
+        return self.goto_value[self.goto_base[state] + self.nonterm_index[name]]
+
+    # Bytes taken by the arrays
+    def nbytes(self):
+        arrays = (self.action_base, self.action_check, self.action_value, self.goto_base, self.goto_value)
+        return sum(a.itemsize * len(a) for a in arrays)
+
+# Bytes taken by a table of dict rows. The keys are the symbol names the
+# grammar has anyway and the values small ints, so only the dicts count.
+def dictSize(table):
+    return sys.getsizeof(table) + sum(sys.getsizeof(row) for row in table.values())
+
+def compactSize(tables):
+    return tables.nbytes() + sys.getsizeof(tables.term_index) + sys.getsizeof(tables.nonterm_index)
+
+def bestOf(func, repeat=5):
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        gc.disable()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        gc.enable()
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def lookupRates(parser, tables, rounds=20):
+    action = parser.action
+    goto = parser.goto
+    terms = tables.terminals + ['UNKNOWN']
+    actionKeys = [(state, tok) for state in sorted(action) for tok in terms] * rounds
+    gotoKeys = [(state, name) for state in sorted(goto) for name in goto[state]] * rounds
+
+    abase, acheck, avalue = tables.action_base, tables.action_check, tables.action_value
+    gbase, gvalue = tables.goto_base, tables.goto_value
+    termIndex, unknown, ntIndex = tables.term_index, tables.unknown_term, tables.nonterm_index
+    for state, tok in actionKeys[:len(actionKeys) // rounds]:
+        assert action[state].get(tok) == tables.action_get(state, tok)
+    for state, name in gotoKeys[:len(gotoKeys) // rounds]:
+        assert goto[state][name] == tables.goto_get(state, name)
+
+    # Written out as the parse loops do it
+    def dictActions():
+        for state, tok in actionKeys:
+            t = action[state].get(tok)
+
+    def compactActions():
+        for state, tok in actionKeys:
+            i = abase[state] + termIndex.get(tok, unknown)
+            t = avalue[i] if acheck[i] == state else None
+
+    # The parse loop has the nonterminal number ready with the production
+    gotoCodes = [(state, ntIndex[name]) for state, name in gotoKeys]
+
+    def dictGotos():
+        for state, name in gotoKeys:
+            t = goto[state][name]
+
+    def compactGotos():
+        for state, code in gotoCodes:
+            t = gvalue[gbase[state] + code]
+
+    return (len(actionKeys) / bestOf(dictActions), len(actionKeys) / bestOf(compactActions),
+            len(gotoKeys) / bestOf(dictGotos), len(gotoKeys) / bestOf(compactGotos))
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    grammars = [("json", dev.get_parser(), lexAll(JSONLexer(dev.t_error), recordArray(n))),
+                ("regex", HW1_part2.get_parser(), lexAll(HW1_part2.get_lexer(), '|'.join(['(a.b)*.c?'] * (n // 10))))]
+
+    print(f"{'grammar':>8} {'states':>7} {'entries':>8} {'dict bytes':>11} {'array bytes':>12} {'ratio':>6}")
+    for name, parser, tokens in grammars:
+        tables = CompactLRTables(parser.action, parser.goto)
+        entries = sum(len(row) for row in parser.action.values()) + sum(len(row) for row in parser.goto.values())
+        before = dictSize(parser.action) + dictSize(parser.goto)
+        after = compactSize(tables)
+        print(f"{name:>8} {len(tables.action_base):7d} {entries:8d} {before:11d} {after:12d} {before / after:6.1f}")
+
+    print()
+    print(f"{'grammar':>8} {'action/s dict':>14} {'compact':>11} {'goto/s dict':>12} {'compact':>11} {'parse tok/s':>12}")
+    for name, parser, tokens in grammars:
+        tables = CompactLRTables(parser.action, parser.goto)
+        dictAction, compactAction, dictGoto, compactGoto = lookupRates(parser, tables)
+        elapsed, _ = timeParse(parser, tokens, True)
+        print(f"{name:>8} {dictAction:14.0f} {compactAction:11.0f} {dictGoto:12.0f} {compactGoto:11.0f} {len(tokens) / elapsed:12.0f}")
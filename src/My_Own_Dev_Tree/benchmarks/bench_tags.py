@@ -0,0 +1,91 @@
+# Output rate of the XML writer with the tags of every element put together
+# from the fragments cached per key and depth (xmlwriter.TagCache), against
+# formatting the key into the tags of every element as it was done before.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 benchmarks/bench_tags.py [rows]
+#
+# The trees are parsed once and not timed. Both writers write the whole tree
+# (no duplicate removal) into a StringWriter and are checked to give the same
+# XML. The rates are UTF-8 bytes of XML per second, best of a few runs.
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import dev
+from dev import OBJECT, ARRAY, PRIMITIVE, nodeText
+from xmlwriter import StringWriter, DEFAULT_INDENT, newlineFor, escapeText
+from corpus import recordArray, wideRecords
+
+# A leaf formatted from scratch, as xmlwriter did before the TagCache
+def leafXML(pad, tag, text, newl='\n'):
+    if text == '':
+        return f"{pad}<{tag}/>{newl}"
+    return f"{pad}<{tag}>{escapeText(text)}</{tag}>{newl}"
+
+# dev._writeXML as it was before, without the duplicate removal
+def legacyWriteXML(node, writer, indent, level):
+    write = writer.write
+    pad = indent or ''
+    newl = newlineFor(indent)
+    stack = [(dev._PAIRS, None, node, level)]
+    while stack:
+        entry = stack.pop()
+        if type(entry) is str:
+            write(entry)
+            continue
+        op, tag, node, level = entry
+        children = node.children
+        if op == dev._PAIRS:
+            for pair in reversed(children):
+                value = pair.children[0]
+                stack.append((dev._ITEMS if value.type == ARRAY else dev._ELEMENT, nodeText(pair), value, level))
+        elif op == dev._ITEMS:
+            for child in reversed(children):
+                stack.append((dev._ELEMENT, tag, child, level))
+        elif node.type == PRIMITIVE:
+            write(leafXML(pad * level, tag, nodeText(node), newl))
+        else:
+            write(f"{pad * level}<{tag}>{newl}")
+            stack.append(f"{pad * level}</{tag}>{newl}")
+            if node.type == OBJECT:
+                stack.append((dev._PAIRS, None, node, level + 1))
+            else:
+                stack.append((dev._ITEMS, node.value, node, level + 1))
+
+def legacy(ast, indent):
+    writer = StringWriter()
+    legacyWriteXML(ast, writer, indent, 1)
+    return writer.getvalue()
+
+def cached(ast, indent):
+    writer = StringWriter()
+    dev.convertToXML(ast, writer, indent)
+    return writer.getvalue()
+
+def bestTime(func, ast, indent, repeat=5):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        xml = func(ast, indent)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, xml
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    docs = [("records", recordArray(n)), ("wide 20", wideRecords(n // 2)),
+            ("wide 60", wideRecords(n // 6, width=60))]
+    mb = 1024 * 1024
+    print(f"{'document':>10} {'indent':>7} {'XML MB':>7} {'legacy MB/s':>12} {'cached MB/s':>12} {'speedup':>8}")
+    for name, text in docs:
+        ast = dev.parse_json(text)
+        for indentName, indent in (("tab", DEFAULT_INDENT), ("none", None)):
+            legacyTime, legacyXML = bestTime(legacy, ast, indent)
+            cachedTime, cachedXML = bestTime(cached, ast, indent)
+            assert legacyXML == cachedXML
+            size = len(cachedXML.encode())
+            print(f"{name:>10} {indentName:>7} {size / mb:7.1f} {size / mb / legacyTime:12.1f} "
+                  f"{size / mb / cachedTime:12.1f} {legacyTime / cachedTime:7.2f}x")
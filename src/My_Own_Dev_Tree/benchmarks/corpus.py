@@ -0,0 +1,62 @@
+# Synthetic JSON documents shared by the benchmarks. Everything here only
+# uses what the grammar in dev.py accepts: strings without escapes,
+# non-negative integers, true/false/null, and non-empty objects/arrays.
+
+import random
+
+NAMES = ["Molecule Man", "Madame Uppercut", "Eternal Flame", "Dan Jukes", "Jane Wilson", "Unknown"]
+POWERS = ["Radiation resistance", "Turning tiny", "Radiation blast", "Million tonne punch",
+          "Damage resistance", "Superhuman reflexes", "Immortality", "Heat Immunity", "Inferno"]
+
+# A test.json-like squad with n members
+def recordArray(n, seed=0):
+    rnd = random.Random(seed)
+    members = []
+    for i in range(n):
+        powers = ', '.join('"%s"' % rnd.choice(POWERS) for _ in range(rnd.randint(1, 4)))
+        members.append('{"name": "%s", "age": %d, "secretIdentity": "%s", "active": %s, "powers": [%s]}'
+                       % (rnd.choice(NAMES), rnd.randint(18, 99), rnd.choice(NAMES),
+                          rnd.choice(("true", "false")), powers))
+    return ('{"squadName": "Super hero squad", "formed": 2016, "members": [%s], "squadName": "dup"}'
+            % ',\n'.join(members))
+
+# One array of n primitives, with every value repeated dupFactor times
+def wideArray(n, dupFactor=2):
+    distinct = max(1, n // dupFactor)
+    return '{"values": [%s]}' % ', '.join('"v%d"' % (i % distinct) for i in range(n))
+
+# An array of n records with width fields each, all with the same keys: short
+# strings, numbers and booleans in turn
+def wideRecords(n, width=20, seed=0):
+    rnd = random.Random(seed)
+    keys = ['field%d' % i for i in range(width)]
+    rows = []
+    for _ in range(n):
+        fields = []
+        for i, key in enumerate(keys):
+            if i % 3 == 0:
+                value = '"%s"' % rnd.choice(NAMES)
+            elif i % 3 == 1:
+                value = str(rnd.randint(0, 9999))
+            else:
+                value = rnd.choice(("true", "false"))
+            fields.append('"%s": %s' % (key, value))
+        rows.append('{%s}' % ', '.join(fields))
+    return '{"rows": [%s]}' % ',\n'.join(rows)
+
+# Objects nested depth levels deep: {"a": {"a": ... {"a": 1} ... }}
+def deepObject(depth):
+    return '{"a": ' * depth + '1' + '}' * depth
+
+# Objects with long string values, many of them repeated
+def stringHeavy(n, length=80, seed=0):
+    rnd = random.Random(seed)
+    words = [''.join(rnd.choice('abcdefghij klmnop') for _ in range(length)) for _ in range(50)]
+    return '{"rows": [%s]}' % ', '.join('{"id": "%d", "text": "%s", "note": "%s"}'
+                                          % (i, rnd.choice(words), rnd.choice(words)) for i in range(n))
+
+# The same document pretty-printed with indent spaces per level. Duplicate
+# keys are lost on the way through the json module.
+def pretty(text, indent=4):
+    import json
+    return json.dumps(json.loads(text), indent=indent)
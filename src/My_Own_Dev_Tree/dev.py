@@ -1,15 +1,31 @@
-import argparse
-import ply.lex as lex
-import ply.yacc as yacc
-import xml.dom.minidom as md
+import os
+from contextlib import contextmanager
+from json.decoder import scanstring
+from xmlwriter import FileWriter, DEFAULT_INDENT, newlineFor, escapeText, TagCache
 
 
 def removeDoubleQuotes(string):
-    finalString = ''
-    for i in string:
-        if not (i == "\"" or i == "\'"):
-            finalString += i
-    return finalString
+    return string.replace('"', '').replace("'", '')
+
+# Turns the text of a token into the value of its node: a STRING token loses
+# its delimiting quotes and has its escapes decoded, anything else is kept as
+# it is. The escapes are only looked at when there is a backslash, and one
+# that JSON doesn't know is left in the text as it was written.
+def normalizeValue(token):
+    if token[:1] != '"':
+        return token
+    value = token[1:-1]
+    if '\\' in value:
+        value = _unescape(token, 1, value)
+    return value
+
+# The string starting after the quote at token[start], with its escapes
+# decoded, or raw if they can't be
+def _unescape(token, start, raw):
+    try:
+        return scanstring(token, start, False)[0]
+    except ValueError:
+        return raw
 
 tokens = (
     'STRING',
@@ -25,8 +41,11 @@ tokens = (
     'NULL',
 )
 
-t_STRING = r'"[^"]*"'
-t_NUMBER = r'\d+'
+# A backslash escapes the character after it, so \" doesn't end the string
+t_STRING = r'"[^"\\]*(?:\\[\s\S][^"\\]*)*"'
+# JSON numbers are written with ASCII digits only; \d would also take the
+# digits of other scripts
+t_NUMBER = r'[0-9]+'
 t_LCURLY = r'\{'
 t_RCURLY = r'\}'
 t_LSQUARE = r'\['
@@ -43,16 +62,75 @@ def t_error(t):
     print(f"Illegal character '{t.value[0]}'")
     t.lexer.skip(1)
 
+# Node types. These are small ints rather than strings so that every node
+# points at the same few objects and the type checks are int comparisons.
+OBJECT = 0
+PAIR = 1
+ARRAY = 2
+PRIMITIVE = 3
+
+TYPE_NAMES = ("object", "pair", "array", "primitive")
+TYPE_TAGS = {name: tag for tag, name in enumerate(TYPE_NAMES)}
+
+# Children of primitives; shared by all of them
+NO_CHILDREN = ()
+
 class TreeNode:
+    # No per-node __dict__. removeChildren is only turned into a list by
+    # labelDuplicates when an object/array actually has duplicates.
+    __slots__ = ('type', 'value', 'children', 'removeChildren')
+
+    isDuplicate = False
+
     def __init__(self, type, value=None, children=None):
+        if type.__class__ is str:
+            type = TYPE_TAGS[type]
         self.type = type
         self.value = value
-        self.isDuplicate = False
-        if type == 'array' or type == 'object':
-            self.removeChildren = []
-        if value is not None:
-            self.value = removeDoubleQuotes(value)
-        self.children = children if children is not None else []
+        self.removeChildren = None
+        if value.__class__ is str:
+            self.value = normalizeValue(value)
+        self.children = children if children is not None else NO_CHILDREN
+
+# Long strings are left in the source text by the lexer (see
+# jsonlex.StringSpan), so the value of a pair or primitive can be a StringSpan
+# instead of a str. Its text is only copied out when it is needed, and never
+# for the pairs and values that are dropped as duplicates before they are
+# written. Anything reading node.value of a pair or primitive goes through
+# nodeText().
+LAZY_STRING_MIN = 64
+
+def nodeText(node):
+    value = node.value
+    if value.__class__ is str or value is None:
+        return value
+    source = value.source
+    if source.__class__ is not str:
+        # Left in the UTF-8 bytes of a mapped file (parse_json_file)
+        return normalizeValue(str(value))
+    text = source[value.start + 1:value.end - 1]
+    if '\\' in text:
+        text = _unescape(source, value.start + 1, text)
+    return text
+
+# Keys and small primitive values (true, false, null, numbers of up to
+# INTERN_NUMBER_MAX digits) are the same few strings over and over in a record
+# array. The parser keeps one value per distinct token text for the document,
+# in the interned dict of the lexer (the lexers in jsonlex start a new one for
+# every input), so equal keys and values share one str instead of each node
+# holding its own copy. The duplicate checks then find them in their sets by
+# identity, before comparing any text. With a lexer that has no interned
+# table the values are made per node as before.
+INTERN_KEY_MAX = 32
+INTERN_NUMBER_MAX = 4
+
+def internValue(table, token, maxLen):
+    if table is None or token.__class__ is not str or len(token) > maxLen:
+        return normalizeValue(token) if token.__class__ is str else token
+    value = table.get(token)
+    if value is None:
+        value = table[token] = normalizeValue(token)
+    return value
 
 def p_json(p):
     '''json : object'''
@@ -60,23 +138,28 @@ def p_json(p):
 
 def p_object(p):
     'object : LCURLY members RCURLY'
-    p[0] = TreeNode("object", None, p[2])
+    p[0] = TreeNode(OBJECT, None, p[2])
 
+# members and elements are left-recursive, so every pair/element is reduced
+# as soon as it has been read and appended to the list built so far. The
+# parse stack stays a few entries deep however long the object/array is.
 def p_members(p):
     '''members : pair
-               | pair COMMA members'''
+               | members COMMA pair'''
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = [p[1]] + p[3]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_pair(p):
     'pair : STRING COLON element'
-    p[0] = TreeNode("pair", p[1], [p[3]])
+    node = p[0] = TreeNode(PAIR, None, (p[3],))
+    node.value = internValue(getattr(p.lexer, 'interned', None), p[1], INTERN_KEY_MAX)
 
 def p_array(p):
     'array : LSQUARE elements RSQUARE'
-    p[0] = TreeNode("array", None, p[2])
+    p[0] = TreeNode(ARRAY, None, p[2])
 
 def p_element(p):
     '''element : primitive
@@ -86,12 +169,13 @@ def p_element(p):
 
 def p_elements(p):
     '''elements : element
-                | element COMMA elements
+                | elements COMMA element
                 '''
     if len(p) == 2:
         p[0] = [p[1]]
     else:
-        p[0] = [p[1]] + p[3]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_primitive(p):
     '''primitive : STRING
@@ -99,154 +183,391 @@ def p_primitive(p):
              | TRUE
              | FALSE
              | NULL'''
-    p[0] = TreeNode("primitive", p[1])
+    token = p[1]
+    if token.__class__ is not str or token[:1] == '"':
+        p[0] = TreeNode(PRIMITIVE, token)
+    else:
+        node = p[0] = TreeNode(PRIMITIVE)
+        # The digit limit is only for numbers; true, false and null are
+        # always interned
+        maxLen = INTERN_NUMBER_MAX if token[0] in '0123456789' else len(token)
+        node.value = internValue(getattr(p.lexer, 'interned', None), token, maxLen)
 
 def p_error(p):
     print(f"Syntax error at '{p.value}'")
 
-lexer = lex.lex()
-parser = yacc.yacc()
+# The lexer and parser are only built the first time they are needed, so
+# importing this module (e.g. for jsonstream or the tree walkers) does not pay
+# for ply or for building the LALR tables. dev.lexer and dev.parser still work
+# through the module __getattr__ below.
+#
+# The lexer is the JSON specific one from jsonlex, which produces the same
+# tokens as lex.lex() would for the t_ rules above. get_ply_lexer() builds the
+# generic ply one.
+_lexer = None
+_parser = None
+
+def get_lexer():
+    global _lexer
+    if _lexer is None:
+        from jsonlex import JSONLexer
+        _lexer = JSONLexer(t_error, LAZY_STRING_MIN)
+    return _lexer
+
+def get_ply_lexer():
+    import ply.lex as lex
+    return lex.lex(optimize=True, lextab='dev_lextab.pickle')
+
+# The parser is made from dev_parsetab.py, a module with the tables and the
+# names of the rule functions that is written the first time the parser is
+# built (see ply.yacc.write_parser_module()). Starting from it skips yacc()
+# and its checks of this module altogether. If the grammar here has changed
+# it is rejected, and the parser is built and the module written again.
+PARSER_MODULE = 'dev_parsetab'
+
+def get_parser():
+    global _parser
+    if _parser is None:
+        import ply.yacc as yacc
+        try:
+            import dev_parsetab
+            _parser = dev_parsetab.make_parser(globals())
+        except (ImportError, yacc.YaccError):
+            _parser = yacc.yacc(tabfile='dev_parsetab.pickle', fold_unit_rules=True, optimize=True)
+            try:
+                yacc.write_parser_module(_parser, globals(), PARSER_MODULE)
+            except OSError:
+                pass
+    return _parser
+
+def __getattr__(name):
+    if name == 'lexer':
+        return get_lexer()
+    if name == 'parser':
+        return get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+# All of the tree walkers below keep their own stack of nodes still to be
+# visited instead of recursing, so that the nesting depth of the JSON is only
+# limited by memory and not by Python's recursion limit.
 
 #Function for checking ambiguity in a given JSON AST
-def labelDuplicates(node, reversedFlag):        
-    if reversedFlag:
-        if node.type == "object" or node.type == "array":
-            valueList = []
-            for i in range(len(node.children)):
-                #print(f"Iteration {i}")
-                if node.children[i].type != 'object':
-                    if (node.children[i].value not in valueList):                
-                        valueList.append(node.children[i].value)
-                    else:                    
+#valueList is a set so that each membership check is O(1) and a whole
+#object/array is labelled in linear time
+def labelDuplicates(node, reversedFlag):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.type == OBJECT or node.type == ARRAY:
+            valueList = set()
+            if reversedFlag:
+                order = range(len(node.children))
+            else:
+                order = range(len(node.children)-1,-1,-1)
+            for i in order:
+                if node.children[i].type != OBJECT:
+                    value = nodeText(node.children[i])
+                    if (value not in valueList):
+                        valueList.add(value)
+                    elif node.removeChildren is None:
+                        node.removeChildren = [i]
+                    else:
                         node.removeChildren.append(i)
-                labelDuplicates(node.children[i], reversedFlag)            
+            stack.extend(node.children)
 
-        elif node.type == "pair":               
-            labelDuplicates(node.children[0], reversedFlag)      
-        
-        elif node.type == "primitive":
-            return
-        
-    else:
-        if node.type == "object" or node.type == "array":
-            valueList = []
-            for i in range(len(node.children)-1,-1,-1):                
-                if node.children[i].type != 'object':
-                    if (node.children[i].value not in valueList):                
-                        valueList.append(node.children[i].value)
-                    else:                    
-                        node.removeChildren.append(i)
-                labelDuplicates(node.children[i], reversedFlag)
+        elif node.type == PAIR:
+            stack.append(node.children[0])
 
-        elif node.type == "pair":               
-            labelDuplicates(node.children[0], reversedFlag)      
-        
-        elif node.type == "primitive":
-            return
-    
 
 def makeDecision(node):
-    if node.type == "object" or node.type == "array":
-        if node.removeChildren != []:
-            for i in sorted(node.removeChildren, reverse = True):
-                del node.children[i]
-        for i in range(len(node.children)):
-            makeDecision(node.children[i])
-    elif node.type == "pair":               
-        makeDecision(node.children[0])
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.type == OBJECT or node.type == ARRAY:
+            if node.removeChildren:
+                for i in sorted(node.removeChildren, reverse = True):
+                    del node.children[i]
+            stack.extend(node.children)
+        elif node.type == PAIR:
+            stack.append(node.children[0])
+
+
+# With bulk=True the whole input is tokenized first, into the compact arrays
+# of jsonlex.tokenizeAll(), and the parser then reads the tokens from those
+def parse_json(input_string, bulk=False):
+    if bulk:
+        from jsonlex import TokenArrayLexer, tokenizeAll
+        lexer = TokenArrayLexer(tokenizeAll(input_string, t_error), LAZY_STRING_MIN)
     else:
-        pass
-
-
-def parse_json(input_string):
-    lexer.input(input_string)
-    ast = parser.parse(lexer=lexer)
+        lexer = get_lexer()
+        lexer.input(input_string)
+    ast = get_parser().parse(lexer=lexer, fast=True)
     return ast
 
+# Parses the JSON file at path without reading it into a str first: the file
+# is mmap'ed and tokenized as UTF-8 bytes. Long strings are left in the
+# mapping as StringSpans and only decoded by nodeText(), so the mapping stays
+# open for as long as the with block using the AST:
+#     with parse_json_file(path) as ast:
+#         convertDocument(ast, writer)
+@contextmanager
+def parse_json_file(path):
+    import mmap
+    from jsonlex import TokenArrayLexer, tokenizeAll
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            # Empty files cannot be mapped
+            yield parse_json('', bulk=True)
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            lexer = TokenArrayLexer(tokenizeAll(data, t_error), LAZY_STRING_MIN)
+            yield get_parser().parse(lexer=lexer, fast=True)
+
 def build_tree(node):
-    if node.type == "object":
-        for pair_node in node.children:
-            build_tree(pair_node)
-    elif node.type == "pair":
-        build_tree(node.children[0])
-    elif node.type == "array":
-        for element_node in node.children:
-            build_tree(element_node)
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.type == OBJECT or node.type == ARRAY or node.type == PAIR:
+            stack.extend(reversed(node.children))
 
 def print_tree(node, level=0):
-    indent = "  " * level
-    print(f"{indent}{node.type}: {node.value}: {node.isDuplicate}")
-    for child in node.children:
-        print_tree(child, level + 1)
-
-def convertToXML(node):    
-    global string
-    #pass
-    if node.type == "object":
-        for child in node.children:
-            convertToXML(child)
-    elif node.type == "pair":  
-        isArray = False      
-        if node.children[0].type == "array":
-            isArray = True
-            node.children[0].value = node.value
-        if not isArray: string  += f"<{node.value}>"
-        convertToXML(node.children[0])
-        if not isArray: string += f"</{node.value}>"
-
-    
-    elif node.type == "array":        
+    stack = [(node, level)]
+    while stack:
+        node, level = stack.pop()
+        indent = "  " * level
+        print(f"{indent}{TYPE_NAMES[node.type]}: {nodeText(node)}: {node.isDuplicate}")
+        for child in reversed(node.children):
+            stack.append((child, level + 1))
+
+# Yields the children of an object/array that survive duplicate removal,
+# with the same rules as labelDuplicates, but without touching the node
+def keptChildren(node, reversedFlag):
+    if reversedFlag:
+        seen = set()
         for child in node.children:
-            string += f"<{node.value}>"
-            convertToXML(child)
-            string += f"</{node.value}>"
-    
-    elif node.type == "primitive":
-        string += f"{node.value}"
-    
-
-        
-            
-
-
+            if child.type != OBJECT:
+                value = nodeText(child)
+                if value in seen:
+                    continue
+                seen.add(value)
+            yield child
+    else:
+        lastIndex = {}
+        values = [nodeText(child) for child in node.children]
+        for i, child in enumerate(node.children):
+            if child.type != OBJECT:
+                lastIndex[values[i]] = i
+        for i, child in enumerate(node.children):
+            if child.type == OBJECT or lastIndex[values[i]] == i:
+                yield child
+
+# Entries on the stack of _writeXML, besides plain strings (closing tags)
+_PAIRS = 0          # write the pairs of an object
+_ITEMS = 1          # write the items of an array, each wrapped in tag
+_ELEMENT = 2        # write a value wrapped in tag
+
+# Record shapes. The objects in a large array are mostly records with the
+# same keys in the same order. An object's shape is the tuple of its keys
+# (the interned key strings, so telling two shapes apart is mostly identity
+# checks), and _writeXML keeps a template per shape and depth: the tag
+# fragments of each key, in order. An object with a template is written by
+# going along its values with the template, without the stack entries per
+# pair and without the duplicate checks, which cannot drop anything when the
+# keys are all different. Shapes with a repeated key get no template, and
+# neither do the shapes met after the first SHAPE_TEMPLATES_MAX ones; those
+# objects take the generic path. An object with a key left in the source as a
+# span has no shape at all: spans are all different objects, so the shapes of
+# such objects would never repeat and would only use up the slots.
+SHAPE_TEMPLATES_MAX = 256
+
+# The shape of pairs, or None
+def _shapeOf(pairs):
+    shape = tuple([pair.value for pair in pairs])
+    for key in shape:
+        if key.__class__ is not str:
+            return None
+    return shape
+
+# The template for shape, or None
+def _shapeTemplate(shape, levelTags):
+    if len(set(shape)) != len(shape):
+        return None
+    return tuple([levelTags[key] for key in shape])
+
+# Shared by convertToXML and convertToXMLFused. With reversedFlag None all
+# children are written, otherwise only the ones kept by keptChildren. The
+# entries carry the fragments of their tag from the TagCache rather than the
+# tag itself, so the items of an array look theirs up once between them.
+def _writeXML(node, writer, indent, level, reversedFlag):
+    write = writer.write
+    tags = TagCache(indent)
+    shapes = {}
+
+    if node.type == OBJECT:
+        stack = [(_PAIRS, None, node, level)]
+    elif node.type == PAIR:
+        value = node.children[0]
+        stack = [(_ITEMS if value.type == ARRAY else _ELEMENT, tags[level][nodeText(node)], value, level)]
+    elif node.type == ARRAY:
+        stack = [(_ITEMS, tags[level][node.value], node, level)]
+    else:
+        write(escapeText(nodeText(node)))
+        return
+
+    while stack:
+        entry = stack.pop()
+        if type(entry) is str:
+            write(entry)
+            continue
+
+        op, fragments, node, level = entry
+        if reversedFlag is None:
+            children = node.children
+        elif op != _ELEMENT:
+            children = list(keptChildren(node, reversedFlag))
+
+        if op == _PAIRS:
+            levelTags = tags[level]
+            for pair in reversed(children):
+                value = pair.children[0]
+                # The items of an array value are tagged with the key itself
+                stack.append((_ITEMS if value.type == ARRAY else _ELEMENT, levelTags[nodeText(pair)], value, level))
+
+        elif op == _ITEMS:
+            for child in reversed(children):
+                stack.append((_ELEMENT, fragments, child, level))
+
+        elif node.type == PRIMITIVE:
+            text = nodeText(node)
+            write(fragments[2] + escapeText(text) + fragments[3] if text else fragments[4])
+
+        else:
+            write(fragments[0])
+            stack.append(fragments[1])
+            if node.type == OBJECT:
+                pairs = node.children
+                shape = _shapeOf(pairs)
+                template = None
+                if shape is not None:
+                    levelShapes = shapes.get(level)
+                    if levelShapes is None:
+                        levelShapes = shapes[level] = {}
+                    template = levelShapes.get(shape, False)
+                    if template is False:
+                        template = None
+                        if len(levelShapes) < SHAPE_TEMPLATES_MAX:
+                            template = levelShapes[shape] = _shapeTemplate(shape, tags[level + 1])
+                if template is None:
+                    stack.append((_PAIRS, None, node, level + 1))
+                    continue
+                # Primitive values are written here; from the first value
+                # that is not, the rest of the pairs go on the stack
+                i = 0
+                for fragments, pair in zip(template, pairs):
+                    value = pair.children[0]
+                    if value.type != PRIMITIVE:
+                        break
+                    text = nodeText(value)
+                    write(fragments[2] + escapeText(text) + fragments[3] if text else fragments[4])
+                    i += 1
+                for j in range(len(pairs) - 1, i - 1, -1):
+                    value = pairs[j].children[0]
+                    stack.append((_ITEMS if value.type == ARRAY else _ELEMENT, template[j], value, level + 1))
+            else:
+                # Nested arrays have no key, so their items end up as <None>
+                stack.append((_ITEMS, tags[level + 1][node.value], node, level + 1))
+
+# Writes the XML for node to writer (see xmlwriter.py), indenting the
+# elements by level. indent=None writes everything on a single line.
+def convertToXML(node, writer, indent=DEFAULT_INDENT, level=1):
+    _writeXML(node, writer, indent, level, None)
+
+# Single pass version of labelDuplicates + makeDecision + convertToXML.
+# Duplicates are skipped while writing, so the AST is left untouched.
+def convertToXMLFused(node, writer, reversedFlag, indent=DEFAULT_INDENT, level=1):
+    _writeXML(node, writer, indent, level, reversedFlag)
+
+# Writes the whole XML document for the AST, wrapped in a <root> element.
+# Without reversedFlag the AST must already have been through
+# labelDuplicates and makeDecision; with it, convertToXMLFused is used.
+def convertDocument(node, writer, indent=DEFAULT_INDENT, reversedFlag=None):
+    newl = newlineFor(indent)
+    writer.write('<?xml version="1.0" ?>' + newl)
+    writer.write('<root>' + newl)
+    if reversedFlag is None:
+        convertToXML(node, writer, indent)
+    else:
+        convertToXMLFused(node, writer, reversedFlag, indent)
+    writer.write('</root>' + newl)
+
+# A FileWriter for the XML file at outPath. The XML goes to a temporary file
+# next to it, which only replaces outPath when the with block ends without an
+# error, so a failed conversion leaves no partial file behind and an earlier
+# outPath as it was.
+@contextmanager
+def openOutput(outPath):
+    tmpPath = f"{outPath}.{os.getpid()}.tmp"
+    try:
+        with open(tmpPath, "w") as f, FileWriter(f) as writer:
+            yield writer
+        os.replace(tmpPath, outPath)
+    finally:
+        if os.path.exists(tmpPath):
+            os.remove(tmpPath)
+
+# Converts the JSON file at inPath into the XML file at outPath. Used by the
+# command line below and by the batch converter.
+def convertFile(inPath, outPath, reversedFlag, indent=DEFAULT_INDENT, stream=False, threePass=False, useMmap=False):
+    if stream:
+        import jsonstream
+        with open(inPath) as ff, openOutput(outPath) as writer:
+            jsonstream.streamToXML(ff, writer, reversedFlag, indent)
+        return
+
+    if useMmap:
+        with parse_json_file(inPath) as result_ast:
+            _convertTree(result_ast, inPath, outPath, reversedFlag, indent, threePass)
+    else:
+        with open(inPath) as ff:
+            input_string = ff.read()
+        _convertTree(parse_json(input_string), inPath, outPath, reversedFlag, indent, threePass)
 
+def _convertTree(result_ast, inPath, outPath, reversedFlag, indent, threePass):
+    if result_ast is None:
+        raise SyntaxError(f"Could not parse {inPath}")
+    #print("AST:")
+    #print_tree(result_ast)
+    if threePass:
+        labelDuplicates(result_ast, reversedFlag)
+        #print("AST after duplicate matching: ")
+        #print_tree(result_ast)
+        makeDecision(result_ast)
+        #print("AST after duplicate removal: ")
+        #print_tree(result_ast)
 
+    with openOutput(outPath) as writer:
+        convertDocument(result_ast, writer, indent, None if threePass else reversedFlag)
 
 if __name__ == "__main__":
+    import argparse
     parsa = argparse.ArgumentParser(prog='JSON Tree Parser')
     parsa.add_argument('-f', '--filename', help='Path to the input JSON File')
     parsa.add_argument('-d', '--duplicateflag', help='True if first occurence has to be retained/False if last occurence has to be retained ')
+    parsa.add_argument('-s', '--stream', action='store_true', help='Convert while reading the input, without building the whole tree in memory')
+    parsa.add_argument('-i', '--indent', type=int, help='Indent the XML with this many spaces instead of a tab')
+    parsa.add_argument('-c', '--compact', action='store_true', help='Write the XML on a single line without indentation')
+    parsa.add_argument('-m', '--mmap', action='store_true', help='Map the input file into memory and tokenize its bytes instead of reading it into a string')
+    parsa.add_argument('--three-pass', action='store_true', help='Run labelDuplicates, makeDecision and convertToXML as separate passes instead of the single pass converter')
     args = parsa.parse_args()
-    input_string = ''
-    with open(args.filename) as ff:
-        input_string = ff.read()
-    result_ast = parse_json(input_string)
-    #print("AST:")
-    #print_tree(result_ast)
-    #print(args.duplicateflag)
     flag = True if args.duplicateflag == "True" else False
-    
-    print(flag)
-    labelDuplicates(result_ast, flag)
-    #print("AST after duplicate matching: ")
-    #print_tree(result_ast)
-    makeDecision(result_ast)
-    #print("AST after duplicate removal: ")
-    #print_tree(result_ast)
-
-    string = '<root>'
-    convertToXML(result_ast)
-    string += '</root>'
-
-    dom = md.parseString(string) # or xml.dom.minidom.parseString(xml_string)
-    pretty_xml_as_string = dom.toprettyxml()
-    if flag:
-        with open("TrueXMLFile.xml","w") as f:
-            f.write(pretty_xml_as_string)
-    
+    if args.compact:
+        indent = None
+    elif args.indent is not None:
+        indent = ' ' * args.indent
     else:
-        with open("FalseXMLFile.xml","w") as f:
-            f.write(pretty_xml_as_string)
+        indent = DEFAULT_INDENT
+    outputFile = "TrueXMLFile.xml" if flag else "FalseXMLFile.xml"
 
+    print(flag)
+    convertFile(args.filename, outputFile, flag, indent, args.stream, args.three_pass, args.mmap)
     print("Wrote to XML File")
-
@@ -0,0 +1,292 @@
+import re
+from array import array
+
+# A lexer written for the JSON tokens in dev.py, used instead of the generic
+# ply.lex one.
+#
+# It produces the same tokens as lex.lex() does for the t_ rules in dev.py and
+# has the parts of the ply Lexer interface that yacc uses (input(), token(),
+# lineno, lexpos), so it can be passed to parser.parse(lexer=...) as it is.
+# Instead of trying the master regex at every position it looks at the first
+# character of the token to decide what it can be, and whitespace is skipped a
+# whole run at a time.
+
+# Keep these in step with the t_ rules in dev.py
+_STRING = re.compile(r'"[^"\\]*(?:\\[\s\S][^"\\]*)*"')
+_NUMBER = re.compile(r'[0-9]+')
+_IGNORE = ' \t\n'
+_skipIgnored = re.compile('[%s]+' % re.escape(_IGNORE)).match
+
+# First character -> (token type, regex). Tokens without a regex are one
+# character long.
+_DISPATCH = {
+    '{': ('LCURLY', None),
+    '}': ('RCURLY', None),
+    '[': ('LSQUARE', None),
+    ']': ('RSQUARE', None),
+    ',': ('COMMA', None),
+    ':': ('COLON', None),
+    '"': ('STRING', _STRING),
+    't': ('TRUE', re.compile('true')),
+    'f': ('FALSE', re.compile('false')),
+    'n': ('NULL', re.compile('null')),
+}
+for _digit in '0123456789':
+    _DISPATCH[_digit] = ('NUMBER', _NUMBER)
+
+# The value of a STRING token that is left in the source text instead of being
+# copied out: str() of it is source[start:end], quotes included (decoded, if
+# the source is UTF-8 bytes). The lexers
+# hand these out for strings of at least lazyStrings characters when they are
+# given lazyStrings. Each one costs about as much memory as a 64 character
+# str, so shorter strings are still copied.
+class StringSpan:
+    __slots__ = ('source', 'start', 'end')
+
+    def __init__(self, source, start, end):
+        self.source = source
+        self.start = start
+        self.end = end
+
+    def __str__(self):
+        text = self.source[self.start:self.end]
+        if text.__class__ is not str:
+            text = _decode(text)
+        return text
+
+    def __len__(self):
+        return self.end - self.start
+
+    def __repr__(self):
+        return f'StringSpan({self.start},{self.end})'
+
+class Token:
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'lexer')
+
+    def __init__(self, type, value, lineno, lexpos):
+        self.type = type
+        self.value = value
+        self.lineno = lineno
+        self.lexpos = lexpos
+
+    def __repr__(self):
+        return f'LexToken({self.type},{self.value!r},{self.lineno},{self.lexpos})'
+
+class JSONLexer:
+    # errorfunc is called like a ply t_error rule, with a token whose value is
+    # the rest of the input. It should call t.lexer.skip(). See StringSpan for
+    # lazyStrings. interned is the table of the document being read for
+    # dev.internValue().
+    def __init__(self, errorfunc=None, lazyStrings=None):
+        self.errorfunc = errorfunc
+        self.lazyStrings = lazyStrings
+        self.lexdata = ''
+        self.lexpos = 0
+        self.lexlen = 0
+        self.lineno = 1
+        self.interned = {}
+
+    def input(self, s):
+        self.lexdata = s
+        self.lexpos = 0
+        self.lexlen = len(s)
+        self.interned = {}
+
+    def skip(self, n):
+        self.lexpos += n
+
+    def token(self):
+        data = self.lexdata
+        pos = self.lexpos
+        end = self.lexlen
+        while pos < end:
+            c = data[pos]
+            if c in _IGNORE:
+                pos = _skipIgnored(data, pos).end()
+                continue
+            rule = _DISPATCH.get(c)
+            if rule is not None:
+                ttype, regex = rule
+                if regex is None:
+                    self.lexpos = pos + 1
+                    return Token(ttype, c, self.lineno, pos)
+                m = regex.match(data, pos)
+                if m is not None:
+                    self.lexpos = end = m.end()
+                    lazy = self.lazyStrings
+                    if lazy is not None and ttype == 'STRING' and end - pos >= lazy:
+                        return Token(ttype, StringSpan(data, pos, end), self.lineno, pos)
+                    return Token(ttype, m.group(), self.lineno, pos)
+
+            # No token starts here
+            if self.errorfunc is None:
+                self.lexpos = pos
+                raise SyntaxError(f"Illegal character {c!r} at index {pos}")
+            tok = Token('error', data[pos:], self.lineno, pos)
+            tok.lexer = self
+            self.lexpos = pos
+            self.errorfunc(tok)
+            if self.lexpos == pos:
+                raise SyntaxError(f"Illegal character {c!r} at index {pos}")
+            pos = self.lexpos
+        self.lexpos = pos
+        return None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t = self.token()
+        if t is None:
+            raise StopIteration
+        return t
+
+# Tokenizing a whole document up front.
+#
+# tokenizeAll() runs one tight loop over the input and keeps only three
+# numbers per token: a type code (an index into TOKEN_TYPES) in an array('B')
+# and the start and end offsets of the token text in two array('q')s. That is
+# 17 bytes per token instead of a token object per token. TokenArrayLexer
+# hands the tokens to the parser, creating each token object only when the
+# parser asks for it.
+
+TOKEN_TYPES = ('STRING', 'NUMBER', 'LCURLY', 'RCURLY', 'LSQUARE', 'RSQUARE',
+               'COMMA', 'COLON', 'TRUE', 'FALSE', 'NULL')
+
+# The text of the tokens that can only be spelled one way
+TOKEN_TEXT = (None, None, '{', '}', '[', ']', ',', ':', 'true', 'false', 'null')
+
+_TOKEN_PATTERNS = (_STRING.pattern, _NUMBER.pattern, r'\{', r'\}', r'\[', r'\]',
+                   ',', ':', 'true', 'false', 'null')
+
+# Group i + 1 is token type i. Leading whitespace is part of the match, so
+# the scanner can go from one token straight to the next.
+_tokenScanner = re.compile('[%s]*(?:%s)' % (re.escape(_IGNORE),
+                                            '|'.join('(%s)' % p for p in _TOKEN_PATTERNS))).scanner
+
+# The same for UTF-8 bytes (bytes, or an mmap of the file). A file opened in
+# text mode has its \r\n and \r turned into \n before we see it, so here \r
+# is skipped as well and translated inside strings by _decode().
+_BYTES_IGNORE = (_IGNORE + '\r').encode()
+_bytesTokenScanner = re.compile(b'[%s]*(?:%s)' % (re.escape(_BYTES_IGNORE),
+                                                  b'|'.join(b'(%s)' % p.encode() for p in _TOKEN_PATTERNS))).scanner
+
+def _decode(value):
+    text = value.decode()
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+class TokenArrays:
+    def __init__(self, data):
+        self.data = data
+        self.isText = isinstance(data, str)
+        self.types = array('B')
+        self.starts = array('q')
+        self.ends = array('q')
+
+    def __len__(self):
+        return len(self.types)
+
+# Tokenize all of data, a str or UTF-8 bytes. errorfunc works as for
+# JSONLexer, but is called while tokenizing, i.e. before the parser has seen
+# any of the tokens.
+def tokenizeAll(data, errorfunc=None):
+    tokens = TokenArrays(data)
+    if tokens.isText:
+        scanner = _tokenScanner
+        ignore = _IGNORE
+    else:
+        scanner = _bytesTokenScanner
+        ignore = _BYTES_IGNORE
+    addType = tokens.types.append
+    addStart = tokens.starts.append
+    addEnd = tokens.ends.append
+    end = len(data)
+    pos = 0
+    while True:
+        m = None
+        for m in iter(scanner(data, pos).match, None):
+            i = m.lastindex
+            addType(i - 1)
+            addStart(m.start(i))
+            addEnd(m.end())
+        if m is not None:
+            pos = m.end()
+        # The scanner stops at the end of the input or at something that is
+        # not a token
+        while pos < end and data[pos] in ignore:
+            pos += 1
+        if pos >= end:
+            return tokens
+        pos = _illegal(data, pos, errorfunc, tokens.isText)
+
+# Hands the illegal character at pos to errorfunc and returns where to carry on
+def _illegal(data, pos, errorfunc, isText):
+    if isText:
+        rest = data[pos:]
+    else:
+        # Enough bytes for the character, which errorfunc sees decoded
+        rest = data[pos:pos + 64].decode('utf-8', 'replace')
+    if errorfunc is None:
+        raise SyntaxError(f"Illegal character {rest[0]!r} at index {pos}")
+    lexer = JSONLexer(errorfunc)
+    lexer.input(rest)
+    tok = Token('error', rest, lexer.lineno, 0)
+    tok.lexer = lexer
+    errorfunc(tok)
+    skipped = lexer.lexpos
+    if skipped == 0:
+        raise SyntaxError(f"Illegal character {rest[0]!r} at index {pos}")
+    if not isText:
+        skipped = len(rest[:skipped].encode())
+    return pos + skipped
+
+# Feeds the tokens from tokenizeAll() to parser.parse(lexer=...). Token values
+# are made only for the tokens the parser asks for, and for bytes input this
+# is where the input is decoded. lazyStrings is as for JSONLexer; for bytes
+# input the strings left in the source are decoded when str() is taken of
+# them, so the source must stay around (mapped) until then.
+class TokenArrayLexer:
+    def __init__(self, tokens, lazyStrings=None):
+        self.tokens = tokens
+        self.lazyStrings = lazyStrings
+        self.lexdata = tokens.data
+        self.index = 0
+        self.count = len(tokens)
+        self.lexpos = 0
+        self.lineno = 1
+        self.interned = {}
+
+    def input(self, s):
+        self.__init__(tokenizeAll(s), self.lazyStrings)
+
+    def token(self):
+        i = self.index
+        if i >= self.count:
+            self.lexpos = len(self.lexdata)
+            return None
+        self.index = i + 1
+        tokens = self.tokens
+        ttype = tokens.types[i]
+        start = tokens.starts[i]
+        self.lexpos = end = tokens.ends[i]
+        value = TOKEN_TEXT[ttype]
+        if value is None:
+            lazy = self.lazyStrings
+            if lazy is not None and ttype == 0 and end - start >= lazy:
+                value = StringSpan(self.lexdata, start, end)
+            else:
+                value = self.lexdata[start:end]
+                if not tokens.isText:
+                    value = _decode(value)
+        return Token(TOKEN_TYPES[ttype], value, self.lineno, start)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        t = self.token()
+        if t is None:
+            raise StopIteration
+        return t
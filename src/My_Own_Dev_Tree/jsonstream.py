@@ -0,0 +1,305 @@
+import re
+import dev
+from xmlwriter import DEFAULT_INDENT, newlineFor, escapeText, TagCache
+
+# Streaming JSON to XML conversion.
+#
+# This reads the JSON input incrementally from a file object and writes the
+# XML out as soon as each element is known, without ever building the TreeNode
+# AST. The token rules are the same t_ rules that dev.py hands to PLY, and the
+# duplicate handling and XML layout match labelDuplicates/makeDecision/
+# convertDocument.
+#
+# When the first occurence of a key is retained (reversedFlag = True) nothing
+# is buffered at all: memory is bounded by the nesting depth plus the keys seen
+# so far in each open object/array. When the last occurence is retained we
+# cannot know whether a child survives until its parent closes, so the input is
+# read twice: the first pass only finds the values that have a later duplicate
+# (by their position in the document), and the second writes everything else
+# as it goes. Memory is then bounded by the same plus the number of those
+# duplicates. Input that cannot be read twice (a pipe) is converted in one
+# pass, with every open object/array keeping the rendered XML of its surviving
+# children (and only of those) until it closes.
+
+CHUNK_SIZE = 1 << 16
+
+# Build the master regular expression from the t_ rules in dev.py, ordered
+# by decreasing regex length like PLY does for string rules
+_rules = sorted(((name, getattr(dev, 't_' + name)) for name in dev.tokens),
+                key=lambda rule: len(rule[1]), reverse=True)
+_master = re.compile('|'.join('(?P<%s>%s)' % rule for rule in _rules), re.VERBOSE)
+_ignore = re.compile('[%s]*' % re.escape(dev.t_ignore))
+
+# Longest fixed keyword (true/false/null); a shorter unmatched tail might
+# still be the start of one of them once more input arrives
+_KEYWORD_LEN = 5
+
+VALUE_TOKENS = ('STRING', 'NUMBER', 'TRUE', 'FALSE', 'NULL')
+
+# Pulls (type, value) tokens out of a file object, reading it in chunks.
+# Illegal characters are reported unless quiet is set.
+def streamTokens(f, chunkSize=CHUNK_SIZE, quiet=False):
+    buf = ''
+    pos = 0
+    eof = False
+    while True:
+        pos = _ignore.match(buf, pos).end()
+        m = _master.match(buf, pos)
+        if not eof and (pos == len(buf) or m is None or m.end() == len(buf)):
+            # The token may continue in the next chunk. At least as much
+            # input as is pending is read before trying again, so a token
+            # much longer than a chunk is put together and matched a
+            # logarithmic number of times rather than once per chunk.
+            if m is not None or pos == len(buf) or buf[pos] == '"' or len(buf) - pos < _KEYWORD_LEN:
+                parts = [buf[pos:]]
+                pending = len(parts[0])
+                read = 0
+                while True:
+                    data = f.read(chunkSize)
+                    if not data:
+                        eof = True
+                        break
+                    parts.append(data)
+                    read += len(data)
+                    if read >= pending:
+                        break
+                buf = ''.join(parts)
+                pos = 0
+                continue
+        if m is not None:
+            pos = m.end()
+            yield m.lastgroup, m.group()
+        elif pos < len(buf):
+            # Same behaviour as t_error in dev.py
+            if not quiet:
+                print(f"Illegal character '{buf[pos]}'")
+            pos += 1
+        else:
+            return
+
+# An object or array that has been opened but not closed yet
+class _Frame:
+    def __init__(self, kind, tag, level, open, close, dupKey, discard):
+        self.kind = kind            # 'object' or 'array'
+        self.tag = tag              # Tag used for array items
+        self.level = level          # Indentation level of the children
+        self.open = open            # Text written before the children (in _BUFFER
+                                    # mode, the ValueError of a bad tag instead)
+        self.close = close          # Text written after the children
+        self.dupKey = dupKey        # Value compared against the siblings of this frame
+        self.discard = discard      # True if this whole subtree is a duplicate
+        self.seen = {}              # Keys/values retained so far (first occurence wins),
+                                    # or where each was last seen (_SCAN)
+        self.kept = {}              # Rendered children (_BUFFER)
+        self.key = None             # Pending key of the current pair
+        self.expect = 'STRING' if kind == 'object' else 'value'
+
+def _syntaxError(value):
+    # Same message as p_error in dev.py
+    print(f"Syntax error at '{value}'")
+    raise SyntaxError(f"Syntax error at '{value}'")
+
+# How _convert handles duplicates
+_FIRST = 0      # the first occurence is kept and written straight away
+_SCAN = 1       # first of two passes for the last occurence: nothing is
+                # written, the positions of the values to drop are returned
+_LAST = 2       # second pass: written straight away, minus those values
+_BUFFER = 3     # the last occurence in one pass, buffering the kept children
+
+# Convert the JSON read from the file object f into XML written to out
+def streamToXML(f, out, reversedFlag, indent=DEFAULT_INDENT, chunkSize=CHUNK_SIZE):
+    if reversedFlag:
+        _convert(f, out, indent, chunkSize, _FIRST)
+    elif f.seekable():
+        start = f.tell()
+        dropped = _convert(f, None, indent, chunkSize, _SCAN)
+        f.seek(start)
+        _convert(f, out, indent, chunkSize, _LAST, dropped)
+    else:
+        _convert(f, out, indent, chunkSize, _BUFFER)
+
+# Writes the nested lists of text built up in _BUFFER mode. A piece can also
+# be the ValueError of a key that is not a tag name, which is raised here,
+# once it is known that its element is not dropped as a duplicate.
+def _writePieces(out, pieces):
+    stack = [iter(pieces)]
+    while stack:
+        for piece in stack[-1]:
+            if piece.__class__ is list:
+                stack.append(iter(piece))
+                break
+            if piece.__class__ is not str:
+                raise piece
+            out.write(piece)
+        else:
+            stack.pop()
+
+# Stands in for the fragments of a child that is not written
+_DROPPED = ('', '')
+
+def _convert(f, out, indent, chunkSize, mode, dropped=None):
+    newl = newlineFor(indent)
+    tags = TagCache(indent)
+    stack = []
+    done = False
+    counter = 0
+    # Position of the next value in the document, the same in both passes
+    index = 0
+    if mode == _SCAN:
+        dropped = set()
+
+    # Decide if a child with the given duplicate key survives. Objects inside
+    # arrays are never compared with their siblings.
+    def retain(frame, dupKey, compared=True):
+        nonlocal index
+        i = index
+        index += 1
+        if mode == _SCAN:
+            if compared:
+                if dupKey in frame.seen:
+                    dropped.add(frame.seen[dupKey])
+                frame.seen[dupKey] = i
+            # Nothing is written in this pass
+            return False
+        if frame.discard:
+            return False
+        if not compared:
+            return True
+        if mode == _LAST:
+            return i not in dropped
+        if mode == _FIRST:
+            if dupKey in frame.seen:
+                return False
+            frame.seen[dupKey] = None
+        return True
+
+    # The tag fragments of a child that is kept. Only those are looked up,
+    # since a key that is not a tag name raises ValueError. In _BUFFER mode
+    # the child can still be replaced by a later duplicate, so the error is
+    # returned to be kept in its place instead.
+    def fragmentsFor(level, tag):
+        try:
+            return tags[level][tag]
+        except ValueError as e:
+            if mode != _BUFFER:
+                raise
+            return (e, '', e, '', e)
+
+    def emit(frame, dupKey, text):
+        if mode != _BUFFER:
+            out.write(text)
+        else:
+            # A later duplicate replaces the earlier one in its own position
+            frame.kept.pop(dupKey, None)
+            frame.kept[dupKey] = text
+
+    if mode != _SCAN:
+        out.write('<?xml version="1.0" ?>' + newl)
+    for ttype, value in streamTokens(f, chunkSize, mode == _SCAN):
+        if done:
+            _syntaxError(value)
+
+        if not stack:
+            if ttype != 'LCURLY':
+                _syntaxError(value)
+            stack.append(_Frame('object', None, 1, '<root>' + newl, '</root>' + newl, None, mode == _SCAN))
+            if mode == _FIRST or mode == _LAST:
+                out.write('<root>' + newl)
+            continue
+
+        frame = stack[-1]
+        expect = frame.expect
+
+        if expect == 'value':
+            level = frame.level
+            if frame.kind == 'object':
+                tag = dupKey = frame.key
+            else:
+                tag = frame.tag
+                dupKey = None
+
+            if ttype in VALUE_TOKENS:
+                text = dev.normalizeValue(value)
+                if frame.kind == 'array':
+                    dupKey = text
+                if retain(frame, dupKey):
+                    fragments = fragmentsFor(level, tag)
+                    if fragments[0].__class__ is not str:
+                        emit(frame, dupKey, fragments[0])
+                    elif text == '':
+                        emit(frame, dupKey, fragments[4])
+                    else:
+                        emit(frame, dupKey, fragments[2] + escapeText(text) + fragments[3])
+                frame.expect = 'next'
+
+            elif ttype == 'LCURLY':
+                compared = frame.kind == 'object'
+                if not compared:
+                    # Only needs to be unique among the kept children, which
+                    # are otherwise keyed by strings or None
+                    counter += 1
+                    dupKey = counter
+                keep = retain(frame, dupKey, compared)
+                fragments = fragmentsFor(level, tag) if keep else _DROPPED
+                child = _Frame('object', None, level + 1, fragments[0], fragments[1], dupKey, not keep)
+                if mode != _BUFFER and not child.discard:
+                    out.write(child.open)
+                frame.expect = 'next'
+                stack.append(child)
+
+            elif ttype == 'LSQUARE':
+                if frame.kind == 'object':
+                    # The items of an array value are tagged with the key itself
+                    child = _Frame('array', tag, level, '', '', dupKey, not retain(frame, dupKey))
+                else:
+                    # Nested arrays have no key, so their items end up as <None>
+                    keep = retain(frame, dupKey)
+                    fragments = fragmentsFor(level, tag) if keep else _DROPPED
+                    child = _Frame('array', 'None', level + 1, fragments[0], fragments[1], dupKey, not keep)
+                if mode != _BUFFER and not child.discard:
+                    out.write(child.open)
+                frame.expect = 'next'
+                stack.append(child)
+
+            else:
+                _syntaxError(value)
+
+        elif expect == 'next':
+            if ttype == 'COMMA':
+                frame.expect = 'STRING' if frame.kind == 'object' else 'value'
+            elif (ttype == 'RCURLY' and frame.kind == 'object') or (ttype == 'RSQUARE' and frame.kind == 'array'):
+                stack.pop()
+                if mode != _BUFFER:
+                    if not frame.discard:
+                        out.write(frame.close)
+                else:
+                    # The children are kept as they are, in a list inside the
+                    # parent's, so nothing is copied once per level
+                    pieces = [frame.open]
+                    pieces.extend(frame.kept.values())
+                    pieces.append(frame.close)
+                    if stack:
+                        if not frame.discard:
+                            emit(stack[-1], frame.dupKey, pieces)
+                    else:
+                        _writePieces(out, pieces)
+                frame.kept = None
+                if not stack:
+                    done = True
+            else:
+                _syntaxError(value)
+
+        elif expect == 'STRING':
+            if ttype != 'STRING':
+                _syntaxError(value)
+            frame.key = dev.normalizeValue(value)
+            frame.expect = 'COLON'
+
+        elif expect == 'COLON':
+            if ttype != 'COLON':
+                _syntaxError(value)
+            frame.expect = 'value'
+
+    if not done:
+        raise SyntaxError('Syntax error at end of input')
+    return dropped
@@ -39,6 +39,9 @@ import types
 import copy
 import os
 import inspect
+import pickle
+
+__tabversion__ = '2022.10.27-2'   # Version of the lextab file format
 
 # This tuple contains acceptable string types
 StringTypes = (str, bytes)
@@ -146,6 +149,54 @@ class Lexer:
             c.lexmodule = object
         return c
 
+    # ------------------------------------------------------------
+    # dump_tables() - The master regular expressions and state tables
+    # as plain data for the lextab file, with the rule functions
+    # replaced by their names
+    # ------------------------------------------------------------
+    def dump_tables(self):
+        statere = {}
+        for state, ritem in self.lexstatere.items():
+            entries = []
+            for text, (cre, findex), names in zip(self.lexstateretext[state], ritem, self.lexstaterenames[state]):
+                findex = [f and (f[0] and names[i], f[1]) for i, f in enumerate(findex)]
+                entries.append((text, findex, names))
+            statere[state] = entries
+        return {
+            'tokens': sorted(self.lextokens),
+            'literals': self.lexliterals,
+            'reflags': self.lexreflags,
+            'stateinfo': self.lexstateinfo,
+            'statere': statere,
+            'stateignore': self.lexstateignore,
+            'stateerrorf': dict((s, f and f.__name__) for s, f in self.lexstateerrorf.items()),
+            'stateeoff': dict((s, f and f.__name__) for s, f in self.lexstateeoff.items()),
+        }
+
+    # ------------------------------------------------------------
+    # load_tables() - Set up the lexer from the data of dump_tables(),
+    # looking up the rule functions in fdict
+    # ------------------------------------------------------------
+    def load_tables(self, tables, fdict):
+        self.lextokens = set(tables['tokens'])
+        self.lexliterals = tables['literals']
+        self.lextokens_all = self.lextokens | set(self.lexliterals)
+        self.lexreflags = tables['reflags']
+        self.lexstateinfo = tables['stateinfo']
+        self.lexstateignore = tables['stateignore']
+        self.lexstatere = {}
+        self.lexstateretext = {}
+        self.lexstaterenames = {}
+        for state, entries in tables['statere'].items():
+            self.lexstatere[state] = [(re.compile(text, self.lexreflags),
+                                       [f and (f[0] and fdict[f[0]], f[1]) for f in findex])
+                                      for text, findex, names in entries]
+            self.lexstateretext[state] = [text for text, findex, names in entries]
+            self.lexstaterenames[state] = [names for text, findex, names in entries]
+        self.lexstateerrorf = dict((s, name and fdict[name]) for s, name in tables['stateerrorf'].items())
+        self.lexstateeoff = dict((s, name and fdict[name]) for s, name in tables['stateeoff'].items())
+        self.begin('INITIAL')
+
     # ------------------------------------------------------------
     # input() - Push a new string into the lexer
     # ------------------------------------------------------------
@@ -434,6 +485,28 @@ class LexerReflect(object):
         self.validate_rules()
         return self.error
 
+    # Compute a signature over the token rules
+    def signature(self):
+        parts = []
+        try:
+            parts.append(' '.join(self.tokens))
+            parts.append(repr(self.literals))
+            parts.append(repr(sorted(self.stateinfo.items())))
+            parts.append(str(self.reflags))
+            for state in sorted(self.stateinfo):
+                parts.append(state)
+                for fname, f in self.funcsym.get(state, ()):
+                    parts.append('%s %s' % (fname, _get_regex(f)))
+                for name, r in self.strsym.get(state, ()):
+                    parts.append('%s %s' % (name, r))
+                for kind, funcs in (('error', self.errorf), ('eof', self.eoff)):
+                    if state in funcs:
+                        parts.append('%s %s' % (kind, funcs[state].__name__))
+                parts.append(repr(self.ignore.get(state)))
+        except (TypeError, ValueError, AttributeError):
+            pass
+        return '\n'.join(parts)
+
     # Get the tokens map
     def get_tokens(self):
         tokens = self.ldict.get('tokens', None)
@@ -710,47 +783,61 @@ class LexerReflect(object):
             linen += 1
 
 # -----------------------------------------------------------------------------
-# lex(module)
+# The lextab file
 #
-# Build all of the regular expression rules from definitions in the supplied module
+# lex() saves the master regular expressions and state tables it builds in the
+# lextab file, under the signature of the token rules (see
+# LexerReflect.signature()).  A later lex() for rules with the same signature
+# restores the lexer from the file instead of forming the master regular
+# expressions again.  The rules only get saved once they passed
+# validate_all(), so lex(optimize=True) trusts them and skips the checks too.
 # -----------------------------------------------------------------------------
-def lex(*, module=None, object=None, debug=False, 
-        reflags=int(re.VERBOSE), debuglog=None, errorlog=None):
 
-    global lexer
-
-    ldict = None
-    stateinfo  = {'INITIAL': 'inclusive'}
-    lexobj = Lexer()
-    global token, input
-
-    if errorlog is None:
-        errorlog = PlyLogger(sys.stderr)
-
-    if debug:
-        if debuglog is None:
-            debuglog = PlyLogger(sys.stderr)
-
-    # Get the module dictionary used for the lexer
-    if object:
-        module = object
-
-    # Get the module dictionary used for the parser
-    if module:
-        _items = [(k, getattr(module, k)) for k in dir(module)]
-        ldict = dict(_items)
-        # If no __file__ attribute is available, try to obtain it from the __module__ instead
-        if '__file__' not in ldict:
-            ldict['__file__'] = sys.modules[ldict['__module__']].__file__
-    else:
-        ldict = get_caller_module_dict(2)
-
-    # Collect parser information from the dictionary
-    linfo = LexerReflect(ldict, log=errorlog, reflags=reflags)
-    linfo.get_all()
-    if linfo.validate_all():
-        raise SyntaxError("Can't build lexer")
+# Returns the data saved with signature in filename, or None if there is no
+# file or it was written for other rules or another version of PLY
+def read_lextab(filename, signature):
+    try:
+        with open(filename, 'rb') as f:
+            data = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+    if not isinstance(data, dict) or data.get('version') != __tabversion__:
+        return None
+    if data.get('signature') != signature:
+        return None
+    return data
+
+# tables are from Lexer.dump_tables().  Written under a temporary name
+# first, like the yacc table cache.
+def write_lextab(filename, signature, tables):
+    data = {
+        'version': __tabversion__,
+        'signature': signature,
+        'tables': tables,
+    }
+    replace_file(filename, pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+# Write data (str or bytes) to filename.  The file is written under a
+# temporary name first and then renamed, so that processes starting at the
+# same time never see a partially written file.  Also used by yacc for its
+# table files.
+def replace_file(filename, data):
+    tmpname = '%s.%d.tmp' % (filename, os.getpid())
+    try:
+        with open(tmpname, 'w' if isinstance(data, str) else 'wb') as f:
+            f.write(data)
+        os.replace(tmpname, filename)
+    finally:
+        if os.path.exists(tmpname):
+            os.remove(tmpname)
 
+# -----------------------------------------------------------------------------
+# _build_tables()
+#
+# Build the master regular expressions and the state tables of lexobj from the
+# rules collected by linfo
+# -----------------------------------------------------------------------------
+def _build_tables(lexobj, linfo, ldict, reflags, debug, debuglog, errorlog):
     # Dump some basic debugging information
     if debug:
         debuglog.info('lex: tokens   = %r', linfo.tokens)
@@ -845,6 +932,91 @@ def lex(*, module=None, object=None, debug=False,
             if s not in linfo.ignore:
                 linfo.ignore[s] = linfo.ignore.get('INITIAL', '')
 
+# -----------------------------------------------------------------------------
+# lex(module)
+#
+# Build all of the regular expression rules from definitions in the supplied module
+# -----------------------------------------------------------------------------
+def lex(*, module=None, object=None, debug=False, 
+        reflags=int(re.VERBOSE), debuglog=None, errorlog=None,
+        optimize=False, lextab=None, outputdir=None):
+
+    global lexer
+
+    ldict = None
+    stateinfo  = {'INITIAL': 'inclusive'}
+    lexobj = Lexer()
+    global token, input
+
+    if errorlog is None:
+        errorlog = PlyLogger(sys.stderr)
+
+    if debug:
+        if debuglog is None:
+            debuglog = PlyLogger(sys.stderr)
+
+    # Get the module dictionary used for the lexer
+    if object:
+        module = object
+
+    # Get the module dictionary used for the parser
+    if module:
+        _items = [(k, getattr(module, k)) for k in dir(module)]
+        ldict = dict(_items)
+        # If no __file__ attribute is available, try to obtain it from the __module__ instead
+        if '__file__' not in ldict:
+            ldict['__file__'] = sys.modules[ldict['__module__']].__file__
+    else:
+        ldict = get_caller_module_dict(2)
+
+    # Collect parser information from the dictionary
+    linfo = LexerReflect(ldict, log=errorlog, reflags=reflags)
+    linfo.get_all()
+
+    # In optimize mode, rules whose signature is in the lextab file are not
+    # validated again
+    lextabdata = None
+    if lextab:
+        if outputdir is None:
+            srcfile = ldict.get('__file__')
+            outputdir = os.path.dirname(os.path.abspath(srcfile)) if srcfile else os.getcwd()
+        lextab = os.path.join(outputdir, lextab)
+        signature = linfo.signature()
+        if not linfo.error:
+            lextabdata = read_lextab(lextab, signature)
+
+    # In debug mode the tables are always built, so that they get logged
+    if debug:
+        lextabdata = None
+
+    # The lextab file is only written for rules that passed validate_all(),
+    # so in optimize mode rules it was written for are trusted
+    validated = not (optimize and lextabdata)
+    if validated and linfo.validate_all():
+        raise SyntaxError("Can't build lexer")
+
+    # Restore the master regular expressions and the state tables from the
+    # lextab file if it was written for the same rules
+    restored = False
+    if lextabdata:
+        try:
+            lexobj.load_tables(lextabdata['tables'], ldict)
+            restored = True
+        except KeyError as e:
+            errorlog.warning("Couldn't load lextab file %r. No function %s", lextab, e)
+            # The tables are built from the rules after all, so they have to
+            # be checked first
+            if not validated and linfo.validate_all():
+                raise SyntaxError("Can't build lexer")
+
+    if not restored:
+        _build_tables(lexobj, linfo, ldict, reflags, debug, debuglog, errorlog)
+        if lextab:
+            try:
+                write_lextab(lextab, signature, lexobj.dump_tables())
+            except OSError as e:
+                errorlog.warning("Couldn't write lextab file %r. %s", lextab, e)
+
     # Create global versions of the token() and input() functions
     token = lexobj.token
     input = lexobj.input
@@ -64,7 +64,13 @@
 import re
 import types
 import sys
+import os
 import inspect
+import pickle
+
+from .lex import replace_file
+
+__tabversion__ = '2022.10.27-1'   # Version of the on-disk table cache format
 
 #-----------------------------------------------------------------------------
 #                     === User configurable parameters ===
@@ -218,6 +224,54 @@ class YaccProduction:
     def error(self):
         raise SyntaxError
 
+# The production object used by LRParser.parseopt_notrack().  Instead of a
+# list sliced off the symbol stack for every reduction, it reads the symbols
+# of the right hand side straight from the stack: p[n] is stack[base + n],
+# where stack[base] is the symbol just below the right hand side.  The .slice
+# list is only built if something asks for it.
+
+class YaccStackProduction(YaccProduction):
+    def __init__(self, stack):
+        self.stack = stack
+        self.base = 0
+        self.length = 0
+        self.result = None
+        self.lexer = None
+        self.parser = None
+
+    @property
+    def slice(self):
+        return [self.result] + self.stack[self.base + 1:self.base + self.length]
+
+    def __getitem__(self, n):
+        if n.__class__ is int:
+            if n > 0:
+                return self.stack[self.base + n].value
+            if n == 0:
+                return self.result.value
+            return self.stack[self.base + 1 + n].value
+        return [s.value for s in self.slice[n]]
+
+    def __setitem__(self, n, v):
+        if n == 0:
+            self.result.value = v
+        else:
+            self.slice[n].value = v
+
+    def __len__(self):
+        return self.length
+
+# Symbols created for reductions in parseopt_notrack()
+
+class YaccFastSymbol:
+    __slots__ = ('type', 'value', 'lineno', 'lexpos', 'endlineno', 'endlexpos')
+
+    def __str__(self):
+        return self.type
+
+    def __repr__(self):
+        return str(self)
+
 # -----------------------------------------------------------------------------
 #                               == LRParser ==
 #
@@ -258,9 +312,25 @@ class LRParser:
             rules = list(actions.values())
             if len(rules) == 1 and rules[0] < 0:
                 self.defaulted_states[state] = rules[0]
+        self.fast_tables = None
 
     def disable_defaulted_states(self):
         self.defaulted_states = {}
+        self.fast_tables = None
+
+    # The tables in the form parseopt_notrack() uses them: the rows of the
+    # action and goto tables and the defaulted states (0 where there is none)
+    # as lists indexed by state, and (name, length, callable) for each
+    # production.  Built on first use.
+    def get_fast_tables(self):
+        if self.fast_tables is None:
+            nstates = max(list(self.action) + list(self.goto)) + 1 if self.action else 0
+            actions = [self.action.get(state, {}) for state in range(nstates)]
+            gotos = [self.goto.get(state, {}) for state in range(nstates)]
+            defaulted = [self.defaulted_states.get(state, 0) for state in range(nstates)]
+            rules = [(p.name, p.len, p.callable) for p in self.productions]
+            self.fast_tables = (actions, gotos, defaulted, rules)
+        return self.fast_tables
 
     # parse().
     #
@@ -270,7 +340,14 @@ class LRParser:
     # tracking.  In this mode, symbols will record the starting/ending line number and
     # character index.
 
-    def parse(self, input=None, lexer=None, debug=False, tracking=False):
+    #
+    # With fast=True (and neither debug nor tracking) the parse is done by
+    # parseopt_notrack() below instead, which gives the same results.
+
+    def parse(self, input=None, lexer=None, debug=False, tracking=False, fast=False):
+        if fast and not debug and not tracking:
+            return self.parseopt_notrack(input, lexer)
+
         # If debugging has been specified as a flag, turn it into a logging object
         if isinstance(debug, int) and debug:
             debug = PlyLogger(sys.stderr)
@@ -580,6 +657,206 @@ class LRParser:
             # If we'r here, something really bad happened
             raise RuntimeError('yacc: internal parser error!!!\n')
 
+    # parseopt_notrack().
+    #
+    # The same parsing engine as parse() with the debug and tracking support
+    # taken out, for when neither is wanted.  The action and goto rows and the
+    # production info come from get_fast_tables(), and the right hand side of
+    # a reduction is read directly off the symbol stack by a
+    # YaccStackProduction, so that a reduction only allocates the new symbol.
+    # While a rule runs, p.stack still holds the symbols of its right hand
+    # side.  Any change to the error handling in parse() has to be made here
+    # as well.
+
+    def parseopt_notrack(self, input=None, lexer=None):
+        lookahead = None                         # Current lookahead symbol
+        lookaheadstack = []                      # Stack of lookahead symbols
+        actions, gotos, defaulted, rules = self.get_fast_tables()
+        errorcount = 0                           # Used during error recovery
+
+        # If no lexer was given, we will try to use the lex module
+        if not lexer:
+            from . import lex
+            lexer = lex.lexer
+
+        # If input was supplied, pass to lexer
+        if input is not None:
+            lexer.input(input)
+
+        # Set the token function
+        get_token = self.token = lexer.token
+
+        # Set up the state and symbol stacks
+        statestack = self.statestack = []   # Stack of parsing states
+        symstack = self.symstack = []       # Stack of grammar symbols
+        pslice = YaccStackProduction(symstack)
+        pslice.lexer = lexer
+        pslice.parser = self
+        errtoken   = None                   # Err token
+
+        # The start state is assumed to be (0,$end)
+
+        statestack.append(0)
+        sym = YaccSymbol()
+        sym.type = '$end'
+        symstack.append(sym)
+        state = 0
+        while True:
+            t = defaulted[state]
+            if not t:
+                if lookahead is None:
+                    if not lookaheadstack:
+                        lookahead = get_token()     # Get the next token
+                    else:
+                        lookahead = lookaheadstack.pop()
+                    if lookahead is None:
+                        lookahead = YaccSymbol()
+                        lookahead.type = '$end'
+
+                # Check the action table
+                t = actions[state].get(lookahead.type)
+
+            if t is not None:
+                if t > 0:
+                    # shift a symbol on the stack
+                    statestack.append(t)
+                    state = t
+                    symstack.append(lookahead)
+                    lookahead = None
+
+                    # Decrease error count on successful shift
+                    if errorcount:
+                        errorcount -= 1
+                    continue
+
+                if t < 0:
+                    # reduce a symbol on the stack, emit a production
+                    pname, plen, func = rules[-t]
+
+                    sym = YaccFastSymbol()
+                    sym.type = pname       # Production name
+                    sym.value = None
+
+                    pslice.base = len(symstack) - plen - 1
+                    pslice.length = plen + 1
+                    pslice.result = sym
+
+                    try:
+                        # Call the grammar rule with our special slice object
+                        self.state = state
+                        func(pslice)
+                        if plen:
+                            del symstack[-plen:]
+                            del statestack[-plen:]
+                        symstack.append(sym)
+                        state = gotos[statestack[-1]][pname]
+                        statestack.append(state)
+                    except SyntaxError:
+                        # If an error was set. Enter error recovery state
+                        lookaheadstack.append(lookahead)    # Save the current lookahead token
+                        if plen:
+                            symstack.pop()                  # Leave the rest of the production on the stack
+                        statestack.pop()                    # Pop back one state (before the reduce)
+                        state = statestack[-1]
+                        sym.type = 'error'
+                        sym.value = 'error'
+                        lookahead = sym
+                        errorcount = error_count
+                        self.errorok = False
+
+                    continue
+
+                if t == 0:
+                    n = symstack[-1]
+                    return getattr(n, 'value', None)
+
+            if t is None:
+
+                # We have some kind of parsing error here.  See parse() for
+                # how the recovery works.
+                if errorcount == 0 or self.errorok:
+                    errorcount = error_count
+                    self.errorok = False
+                    errtoken = lookahead
+                    if errtoken.type == '$end':
+                        errtoken = None               # End of file!
+                    if self.errorfunc:
+                        if errtoken and not hasattr(errtoken, 'lexer'):
+                            errtoken.lexer = lexer
+                        self.state = state
+                        tok = self.errorfunc(errtoken)
+                        if self.errorok:
+                            # User must have done some kind of panic
+                            # mode recovery on their own.  The
+                            # returned token is the next lookahead
+                            lookahead = tok
+                            errtoken = None
+                            continue
+                    else:
+                        if errtoken:
+                            if hasattr(errtoken, 'lineno'):
+                                lineno = lookahead.lineno
+                            else:
+                                lineno = 0
+                            if lineno:
+                                sys.stderr.write('yacc: Syntax error at line %d, token=%s\n' % (lineno, errtoken.type))
+                            else:
+                                sys.stderr.write('yacc: Syntax error, token=%s' % errtoken.type)
+                        else:
+                            sys.stderr.write('yacc: Parse error in input. EOF\n')
+                            return
+
+                else:
+                    errorcount = error_count
+
+                # case 1:  the statestack only has 1 entry on it.  The
+                # token is discarded and we just keep going.
+
+                if len(statestack) <= 1 and lookahead.type != '$end':
+                    lookahead = None
+                    errtoken = None
+                    state = 0
+                    # Nuke the pushback stack
+                    del lookaheadstack[:]
+                    continue
+
+                # case 2: the statestack has a couple of entries on it, but we're
+                # at the end of the file. nuke the top entry and generate an error token
+
+                # Start nuking entries on the stack
+                if lookahead.type == '$end':
+                    # Whoa. We're really hosed here. Bail out
+                    return
+
+                if lookahead.type != 'error':
+                    sym = symstack[-1]
+                    if sym.type == 'error':
+                        # Hmmm. Error is on top of stack, we'll just nuke input
+                        # symbol and continue
+                        lookahead = None
+                        continue
+
+                    # Create the error symbol for the first time and make it the new lookahead symbol
+                    t = YaccSymbol()
+                    t.type = 'error'
+
+                    if hasattr(lookahead, 'lineno'):
+                        t.lineno = t.endlineno = lookahead.lineno
+                    if hasattr(lookahead, 'lexpos'):
+                        t.lexpos = t.endlexpos = lookahead.lexpos
+                    t.value = lookahead
+                    lookaheadstack.append(lookahead)
+                    lookahead = t
+                else:
+                    symstack.pop()
+                    statestack.pop()
+                    state = statestack[-1]
+
+                continue
+
+            # If we'r here, something really bad happened
+            raise RuntimeError('yacc: internal parser error!!!\n')
+
 # -----------------------------------------------------------------------------
 #                          === Grammar Representation ===
 #
@@ -1922,6 +2199,290 @@ class LRTable:
             goto[st] = st_goto
             st += 1
 
+# -----------------------------------------------------------------------------
+#                      === Unit Production Folding ===
+#
+# Grammars are full of chain rules such as "element : object" whose action
+# is just p[0] = p[1].  Reducing them does no work apart from calling the
+# function and juggling the stacks.  If every action of the state reached by
+# shifting (or going to) the right hand side X from state s is that reduce,
+# the parser would only ever pop back to s and go to goto[s][A].  So the
+# transition on X can go straight there, with the value of X left on the
+# stack as the value of A.
+#
+# A transition is only redirected if the new target does not accept any
+# lookahead that the state it skips would have rejected, so syntax errors
+# are found with the same token and the same stack depth as before.  The
+# symbols left on the stack keep the type of X rather than A, and in
+# p_error() parser.state may be the later state.
+# -----------------------------------------------------------------------------
+
+def _passthrough(p):
+    p[0] = p[1]
+
+def _passthrough_doc(p):
+    'a : b'
+    p[0] = p[1]
+
+# Check whether func is a grammar rule function whose body is exactly
+# p[0] = p[1], by comparing its bytecode with the functions above
+def is_passthrough(func):
+    if not isinstance(func, types.FunctionType):
+        return False
+    code = func.__code__
+    if func.__doc__ is None:
+        ref = _passthrough.__code__
+        consts, refconsts = code.co_consts, ref.co_consts
+    else:
+        ref = _passthrough_doc.__code__
+        consts, refconsts = code.co_consts[1:], ref.co_consts[1:]
+    return (code.co_code == ref.co_code and consts == refconsts and
+            code.co_names == ref.co_names and code.co_argcount == 1 and
+            not code.co_freevars)
+
+# Names of the pass-through functions among the p_ functions of the grammar
+def find_passthrough(pinfo):
+    return sorted(name for _, _, name, _ in pinfo.pfuncs if is_passthrough(pinfo.pdict[name]))
+
+# Rewrite the action and goto tables of lr in place.  passthrough holds the
+# names of the functions that may be folded.  Returns the number of
+# transitions that were redirected.
+def fold_unit_productions(lr, passthrough):
+    action = lr.lr_action
+    goto = lr.lr_goto
+    prods = lr.lr_productions
+    passthrough = set(passthrough)
+
+    # States whose only action is a reduce by a pass-through unit production
+    unit = {}
+    for state, row in action.items():
+        rules = set(row.values())
+        if len(rules) != 1 or 'error' in row or goto.get(state):
+            continue
+        r = rules.pop()
+        if r < 0 and prods[-r].len == 1 and prods[-r].func in passthrough:
+            unit[state] = prods[-r].name
+
+    def resolve(s, t):
+        while t in unit:
+            u = goto.get(s, {}).get(unit[t])
+            if u is None or not set(action.get(u, ())) <= set(action[t]):
+                break
+            t = u
+        return t
+
+    folded = 0
+    for table, shifts in ((action, True), (goto, False)):
+        for s, row in table.items():
+            for sym, t in row.items():
+                if shifts and t <= 0:
+                    continue
+                target = resolve(s, t)
+                if target != t:
+                    row[sym] = target
+                    folded += 1
+    return folded
+
+# -----------------------------------------------------------------------------
+#                            === Table Cache ===
+#
+# Building the LALR tables is by far the most expensive part of yacc().  The
+# tables only depend on the grammar, so they can be written to a file once
+# and loaded on later runs, as long as the grammar signature (see
+# ParserReflect.signature()) is unchanged.
+# -----------------------------------------------------------------------------
+
+# -----------------------------------------------------------------------------
+# class MiniProduction:
+#
+# This class is a stripped down version of Production that is restored from
+# the table cache.  It has just the attributes needed by LRParser.
+# -----------------------------------------------------------------------------
+
+class MiniProduction(object):
+    def __init__(self, str, name, len, func, file, line):
+        self.name     = name
+        self.len      = len
+        self.func     = func
+        self.callable = None
+        self.file     = file
+        self.line     = line
+        self.str      = str
+
+    def __str__(self):
+        return self.str
+
+    def __repr__(self):
+        return 'MiniProduction(%s)' % self.str
+
+    # Bind the production function name to a callable
+    def bind(self, pdict):
+        if self.func:
+            self.callable = pdict[self.func]
+
+# -----------------------------------------------------------------------------
+# class CachedLRTable:
+#
+# The parsing tables as loaded from the table cache.  This has the same
+# attributes as LRTable that LRParser uses.
+# -----------------------------------------------------------------------------
+
+class CachedLRTable:
+    def __init__(self, action, goto, productions):
+        self.lr_action = action
+        self.lr_goto = goto
+        self.lr_productions = productions
+
+    def bind_callables(self, pdict):
+        for p in self.lr_productions:
+            p.bind(pdict)
+
+# The productions as the tuples of arguments MiniProduction() takes, for
+# the table cache and parser modules
+def _production_tuples(productions):
+    return [(p.str, p.name, p.len, p.func, os.path.basename(p.file), p.line) for p in productions]
+
+# Write the tables of lr to filename (see lex.replace_file())
+def write_table_cache(lr, signature, filename):
+    data = {
+        'version': __tabversion__,
+        'signature': signature,
+        'action': lr.lr_action,
+        'goto': lr.lr_goto,
+        'productions': _production_tuples(lr.lr_productions),
+    }
+    replace_file(filename, pickle.dumps(data, pickle.HIGHEST_PROTOCOL))
+
+# Read the tables back from filename.  Returns None if there is no cache or
+# if it was written for a different grammar or version of PLY.
+def read_table_cache(filename, signature):
+    try:
+        with open(filename, 'rb') as f:
+            data = pickle.load(f)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return None
+
+    if not isinstance(data, dict) or data.get('version') != __tabversion__:
+        return None
+    if data.get('signature') != signature:
+        return None
+
+    productions = [MiniProduction(*p) for p in data['productions']]
+    return CachedLRTable(data['action'], data['goto'], productions)
+
+# -----------------------------------------------------------------------------
+#                       === Standalone Parser Modules ===
+#
+# write_parser_module() writes a parser out as a Python module that makes the
+# same parser again without yacc(): the tables are literals in the module,
+# and the rule functions
+# are looked up by name in the grammar module.  Loading it does no reflection
+# over the grammar module, no validation and no table construction.
+#
+# The module has a single function, make_parser(module), which takes the
+# grammar module (or its dict).  It raises YaccError when the rules, tokens,
+# precedence or start symbol of the grammar module are not the ones the
+# tables were made for, so that the caller can build the parser with yacc()
+# instead and write the module again.  The rules are all of the p_ functions
+# with their docstrings, in the order yacc() reads them, so adding a rule or
+# moving one (which can change the start symbol, or which rule wins a
+# reduce/reduce conflict) is noticed as well as changing one.
+# -----------------------------------------------------------------------------
+
+_parser_module_template = """\
+# %(modulename)s.py
+#
+# Parser for the grammar in %(grammarfile)s, written by
+# %(yaccmodule)s.write_parser_module().  Don't edit this file; it is
+# written again when the grammar changes.
+
+from %(yaccmodule)s import parser_from_tables
+
+_tables = %(tables)s
+
+def make_parser(module):
+    return parser_from_tables(_tables, module)
+"""
+
+# The parts of a grammar module the tables depend on, other than the rule
+# functions themselves
+def _grammar_settings(pdict):
+    prec = pdict.get('precedence')
+    return {
+        'start': pdict.get('start'),
+        'tokens': sorted(pdict.get('tokens') or ()),
+        'precedence': [list(p) for p in prec] if prec else [],
+    }
+
+# (name, docstring) of the p_ functions of a grammar module, ordered by line
+# number like ParserReflect.get_pfunctions() does
+def _rule_functions(pdict):
+    funcs = []
+    for name, item in pdict.items():
+        if name.startswith('p_') and name != 'p_error' and isinstance(item, (types.FunctionType, types.MethodType)):
+            funcs.append((item.__code__.co_firstlineno, name, item.__doc__))
+    funcs.sort()
+    return [(name, doc) for line, name, doc in funcs]
+
+# Pretty print a literal for the module, with one entry per line for the
+# outer levels dicts
+def _format_literal(value, levels=2, indent='    '):
+    if levels and isinstance(value, dict) and value:
+        lines = ['{']
+        for k, v in value.items():
+            lines.append('%s%r: %s,' % (indent, k, _format_literal(v, levels - 1, indent + '    ')))
+        lines.append(indent[:-4] + '}')
+        return '\n'.join(lines)
+    return repr(value)
+
+# Write parser, as made by yacc() from the grammar in module, to the Python
+# module modulename in outputdir (the directory of the grammar module by
+# default).  Returns the name of the file written.
+def write_parser_module(parser, module, modulename, outputdir=None):
+    pdict = module if isinstance(module, dict) else vars(module)
+    grammarfile = pdict.get('__file__')
+    if outputdir is None:
+        outputdir = os.path.dirname(os.path.abspath(grammarfile)) if grammarfile else os.getcwd()
+    filename = os.path.join(outputdir, modulename + '.py')
+
+    tables = {'version': __tabversion__}
+    tables.update(_grammar_settings(pdict))
+    # The rules are the docstrings of the rule functions, and folded unit
+    # productions depend on the function body as well
+    tables['rules'] = _rule_functions(pdict)
+    tables['passthrough'] = sorted(name for name, doc in tables['rules'] if is_passthrough(pdict[name]))
+    tables['action'] = parser.action
+    tables['goto'] = parser.goto
+    tables['productions'] = _production_tuples(parser.productions)
+
+    text = _parser_module_template % {
+        'modulename': modulename,
+        'grammarfile': os.path.basename(grammarfile) if grammarfile else 'an unknown file',
+        'yaccmodule': __name__,
+        'tables': _format_literal(tables),
+    }
+    replace_file(filename, text)
+    return filename
+
+# Make the parser from the tables in a module written by write_parser_module()
+def parser_from_tables(tables, module):
+    pdict = module if isinstance(module, dict) else vars(module)
+    if tables.get('version') != __tabversion__:
+        raise YaccError('Parser tables were written by a different version of PLY')
+    for key, value in _grammar_settings(pdict).items():
+        if tables[key] != value:
+            raise YaccError('The %s of the grammar changed since the parser tables were written' % key)
+    if _rule_functions(pdict) != tables['rules']:
+        raise YaccError('The rules of the grammar changed since the parser tables were written')
+    for name in tables['passthrough']:
+        if not is_passthrough(pdict[name]):
+            raise YaccError('Rule %s changed since the parser tables were written' % name)
+
+    productions = [MiniProduction(*p) for p in tables['productions']]
+    lr = CachedLRTable(tables['action'], tables['goto'], productions)
+    lr.bind_callables(pdict)
+    return LRParser(lr, pdict.get('p_error'))
+
 # -----------------------------------------------------------------------------
 #                            === INTROSPECTION ===
 #
@@ -2270,7 +2831,8 @@ class ParserReflect(object):
 
 def yacc(*, debug=yaccdebug, module=None, start=None,
          check_recursion=True, optimize=False, debugfile=debug_file,
-         debuglog=None, errorlog=None):
+         debuglog=None, errorlog=None, tabfile=None, outputdir=None,
+         fold_unit_rules=False):
 
     # Reference to the parsing method of the last built parser
     global parse
@@ -2317,13 +2879,44 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
 
     errors = False
 
-    # Validate the parser information
-    if pinfo.validate_all():
+    # Use the cached tables if the grammar hasn't changed since they were
+    # written.  In debug mode the tables are always rebuilt so that the
+    # debugging file gets written.
+    lr = None
+    if tabfile:
+        if outputdir is None:
+            srcfile = pdict.get('__file__')
+            outputdir = os.path.dirname(os.path.abspath(srcfile)) if srcfile else os.getcwd()
+        tabfile = os.path.join(outputdir, tabfile)
+        signature = pinfo.signature()
+        if fold_unit_rules:
+            # Whether a rule is folded depends on the body of its function,
+            # which the signature doesn't cover
+            signature += ' fold:' + ','.join(find_passthrough(pinfo))
+        if not debug:
+            lr = read_table_cache(tabfile, signature)
+
+    # Validate the parser information.  The tables are only written for a
+    # grammar that passed, so in optimize mode a grammar with cached tables
+    # is trusted and not checked again.
+    validated = not (optimize and lr)
+    if validated and pinfo.validate_all():
         raise YaccError('Unable to build parser')
 
     if not pinfo.error_func:
         errorlog.warning('no p_error() function is defined')
 
+    if lr:
+        try:
+            lr.bind_callables(pinfo.pdict)
+            parser = LRParser(lr, pinfo.error_func)
+            parse = parser.parse
+            return parser
+        except Exception as e:
+            errorlog.warning('There was a problem loading the table file: %r', e)
+        if not validated and pinfo.validate_all():
+            raise YaccError('Unable to build parser')
+
     # Create a grammar object
     grammar = Grammar(pinfo.tokens)
 
@@ -2474,6 +3067,19 @@ def yacc(*, debug=yaccdebug, module=None, start=None,
                 errorlog.warning('Rule (%s) is never reduced', rejected)
                 warned_never.append(rejected)
 
+    # Fold out the chain rules that only pass their value on
+    if fold_unit_rules:
+        folded = fold_unit_productions(lr, find_passthrough(pinfo))
+        debuglog.info('')
+        debuglog.info('Unit production folding redirected %d transitions', folded)
+
+    # Save the tables for the next time
+    if tabfile:
+        try:
+            write_table_cache(lr, signature, tabfile)
+        except OSError as e:
+            errorlog.warning("Couldn't create %r. %s" % (tabfile, e))
+
     # Build the parser
     lr.bind_callables(pinfo.pdict)
     parser = LRParser(lr, pinfo.error_func)
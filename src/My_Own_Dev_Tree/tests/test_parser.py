@@ -0,0 +1,203 @@
+# The stripped parse loop (parse(fast=True)) and the tables with the unit
+# productions folded out (yacc(fold_unit_rules=True)) against the full
+# parse() loop on the unfolded tables, for the JSON grammar in dev.py and the
+# regular expression grammar in HW1_part2.py. Valid input has to give the
+# same tree, and broken input the same p_error() calls and the same result
+# after error recovery. The command line is checked against the XML files
+# that come with the repo.
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 -m unittest discover tests
+
+import contextlib
+import importlib.util
+import io
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import types
+import unittest
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+import dev
+import HW1_part2
+import ply.yacc as yacc
+from jsonlex import JSONLexer
+
+def makeParsers(module):
+    plain = yacc.yacc(module=module, errorlog=yacc.NullLogger())
+    folded = yacc.yacc(module=module, errorlog=yacc.NullLogger(), fold_unit_rules=True)
+    return plain, folded
+
+# Something comparable for what a parse returned
+def jsonTree(node):
+    if node is None or node.__class__ is not dev.TreeNode:
+        return node
+    return (node.type, dev.nodeText(node), [jsonTree(child) for child in node.children])
+
+def regexTree(node):
+    return repr(node)
+
+def jsonLexer():
+    return JSONLexer(dev.t_error)
+
+def regexLexer():
+    return HW1_part2.get_lexer()
+
+# (tree, everything printed) for one parse. An exception counts as the
+# result: dev.p_error() fails on a syntax error at the end of the input.
+def run(parser, text, lexer, tree, **kwargs):
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        try:
+            result = tree(parser.parse(text, lexer=lexer(), **kwargs))
+        except Exception as e:
+            result = repr(e)
+    return result, out.getvalue()
+
+# Copies of text with a few characters deleted, repeated or replaced by
+# one of alphabet
+def mutations(text, alphabet, count, seed=0):
+    rng = random.Random(seed)
+    for _ in range(count):
+        chars = list(text)
+        for _ in range(rng.randint(1, 3)):
+            i = rng.randrange(len(chars))
+            edit = rng.randrange(3)
+            if edit == 0:
+                del chars[i]
+            elif edit == 1:
+                chars.insert(i, chars[i])
+            else:
+                chars[i] = rng.choice(alphabet)
+            if not chars:
+                break
+        yield ''.join(chars)
+
+JSON_DOCS = [
+    '{"a": 1}',
+    '{"a": [1, 2, [3, "x"]], "b": {"c": true, "d": null, "e": false}, "a": "y"}',
+    '{"s": "with \\"escapes\\" and \\\\", "n": [[[1]]]}',
+    '{"' + 'k' * 70 + '": "' + 'v' * 70 + '", "r": [{"x": 1, "y": 2}, {"x": 3, "y": 4}]}',
+]
+with open(os.path.join(HERE, 'test.json')) as f:
+    JSON_DOCS.append(f.read())
+
+REGEX_DOCS = ['a', '(h.i)* | c.s.e*.2.1.1', '((a|b)*.c?)|d', 'a.b.c|d*|(e?)']
+
+class FastParseTest(unittest.TestCase):
+    def check(self, module, docs, lexer, tree, alphabet, count):
+        plain, folded = makeParsers(module)
+        for text in docs:
+            expected = run(plain, text, lexer, tree)
+            self.assertEqual(expected[1], '', text)
+            self.assertIsNotNone(expected[0], text)
+            self.assertEqual(run(plain, text, lexer, tree, fast=True), expected, text)
+            self.assertEqual(run(folded, text, lexer, tree), expected, text)
+            self.assertEqual(run(folded, text, lexer, tree, fast=True), expected, text)
+
+        for source in docs:
+            for text in mutations(source, alphabet, count):
+                expected = run(plain, text, lexer, tree)
+                self.assertEqual(run(plain, text, lexer, tree, fast=True), expected, text)
+                self.assertEqual(run(folded, text, lexer, tree, fast=True), expected, text)
+
+    def test_json(self):
+        self.check(dev, JSON_DOCS, jsonLexer, jsonTree, '{}[],:"1x ', 300)
+
+    def test_regex(self):
+        self.check(HW1_part2, REGEX_DOCS, regexLexer, regexTree, 'ab()|.*?', 300)
+
+    def test_folding_removes_unit_reductions(self):
+        plain, folded = makeParsers(dev)
+        calls = []
+        for parser in (plain, folded):
+            count = [0]
+            for prod in parser.productions:
+                if prod.callable:
+                    prod.callable = lambda p, func=prod.callable: (count.__setitem__(0, count[0] + 1), func(p))
+            parser.fast_tables = None
+            parser.parse(JSON_DOCS[1], lexer=jsonLexer(), fast=True)
+            calls.append(count[0])
+        self.assertLess(calls[1], calls[0])
+
+# A parser module written by write_parser_module() is only used for the
+# grammar it was written for
+class ParserModuleTest(unittest.TestCase):
+    def loadModule(self, pdict, tmp):
+        parser = yacc.yacc(module=dev, errorlog=yacc.NullLogger(), fold_unit_rules=True)
+        path = yacc.write_parser_module(parser, pdict, 'stale_parsetab', outputdir=tmp)
+        spec = importlib.util.spec_from_file_location('stale_parsetab', path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        return module
+
+    def test_changed_grammar_is_rejected(self):
+        def p_object_empty(p):
+            'object : LCURLY RCURLY'
+            p[0] = dev.TreeNode(dev.OBJECT, None, [])
+
+        # p_json defined after all the other rules, so that the start symbol
+        # becomes the one of the first rule that is left
+        code = dev.p_json.__code__
+        movedJson = types.FunctionType(code.replace(co_firstlineno=code.co_firstlineno + 100000),
+                                       dev.p_json.__globals__, 'p_json')
+        movedJson.__doc__ = dev.p_json.__doc__
+
+        def p_pair(p):
+            'pair : STRING COLON primitive'
+            dev.p_pair(p)
+
+        changes = {'added': ('p_object_empty', p_object_empty), 'moved': ('p_json', movedJson),
+                   'changed': ('p_pair', p_pair)}
+        with tempfile.TemporaryDirectory() as tmp:
+            pdict = dict(vars(dev))
+            module = self.loadModule(pdict, tmp)
+            parser = module.make_parser(pdict)
+            self.assertEqual(jsonTree(parser.parse('{"a": [1]}', lexer=jsonLexer(), fast=True)),
+                             jsonTree(dev.parse_json('{"a": [1]}')))
+            for change, (name, func) in changes.items():
+                with self.subTest(change=change):
+                    changed = dict(pdict)
+                    changed[name] = func
+                    with self.assertRaises(yacc.YaccError):
+                        module.make_parser(changed)
+
+# The XML files in the repo are what dev.py writes for test.json
+class CommandLineTest(unittest.TestCase):
+    MODES = [[], ['--stream'], ['--three-pass'], ['--mmap'], ['--mmap', '--three-pass']]
+
+    def test_golden_files(self):
+        for flag, golden in (('True', 'TrueXMLFile.xml'), ('False', 'FalseXMLFile.xml')):
+            with open(os.path.join(HERE, golden)) as f:
+                expected = f.read()
+            for mode in self.MODES:
+                with self.subTest(flag=flag, mode=mode), tempfile.TemporaryDirectory() as tmp:
+                    subprocess.run([sys.executable, os.path.join(HERE, 'dev.py'), '-f', os.path.join(HERE, 'test.json'),
+                                    '-d', flag] + mode, cwd=tmp, check=True, capture_output=True)
+                    with open(os.path.join(tmp, golden)) as f:
+                        self.assertEqual(f.read(), expected)
+
+    # A failed conversion leaves the file from an earlier one as it was, and
+    # nothing else behind
+    def test_failed_conversion_keeps_output(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            inPath = os.path.join(tmp, 'bad.json')
+            outPath = os.path.join(tmp, 'out.xml')
+            with open(inPath, 'w') as f:
+                f.write('{"bad key": 1}')
+            with open(outPath, 'w') as f:
+                f.write('earlier')
+            for stream, useMmap in ((False, False), (True, False), (False, True)):
+                with self.subTest(stream=stream, mmap=useMmap):
+                    with self.assertRaises(ValueError):
+                        dev.convertFile(inPath, outPath, True, stream=stream, useMmap=useMmap)
+                    with open(outPath) as f:
+                        self.assertEqual(f.read(), 'earlier')
+                    self.assertEqual(sorted(os.listdir(tmp)), ['bad.json', 'out.xml'])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+# The streaming converter (jsonstream.streamToXML) against the converters
+# that parse the whole tree first (dev.convertDocument), for both duplicate
+# flags, on input that can be read twice (a file) and input that can't (a
+# pipe).
+#
+# Run from the My_Own_Dev_Tree folder:
+#     python3 -m unittest discover tests
+
+import io
+import os
+import sys
+import unittest
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, HERE)
+import dev
+import jsonstream
+from xmlwriter import StringWriter
+
+# A StringIO that can only be read front to back, like a pipe
+class Pipe(io.StringIO):
+    def seekable(self):
+        return False
+
+# The XML for text, or the type of the exception converting it raised
+def treeXML(text, reversedFlag):
+    try:
+        writer = StringWriter()
+        dev.convertDocument(dev.parse_json(text), writer, reversedFlag=reversedFlag)
+        return writer.getvalue()
+    except ValueError as e:
+        return type(e)
+
+def streamXML(f, reversedFlag, **kwargs):
+    try:
+        out = io.StringIO()
+        jsonstream.streamToXML(f, out, reversedFlag, **kwargs)
+        return out.getvalue()
+    except ValueError as e:
+        return type(e)
+
+class StreamTest(unittest.TestCase):
+    def check(self, docs, **kwargs):
+        for text in docs:
+            for flag in (True, False):
+                expected = treeXML(text, flag)
+                for f in (io.StringIO(text), Pipe(text)):
+                    with self.subTest(text=text[:60], flag=flag, pipe=f.__class__ is Pipe):
+                        self.assertEqual(streamXML(f, flag, **kwargs), expected)
+
+    # Keys that are not XML names only fail the conversion when their
+    # element is written, not when it is dropped as a duplicate
+    def test_bad_tag_in_dropped_subtree(self):
+        self.check([
+            '{"a": 1, "a": {"b c": {"x": 1}}}',
+            '{"a": {"b c": {"x": 1}}, "a": 1}',
+            '{"a": [{"1st": 1}, [{"b c": 2}]], "a": 3}',
+            '{"a": 3, "a": [{"1st": 1}, [{"b c": 2}]]}',
+            '{"k": [1, "x", 1], "b c": 1}',
+        ])
+
+    # With chunks this small every token is read across a refill of the
+    # buffer, and the long ones across many
+    def test_small_chunks(self):
+        longText = 'x' * 150 + '\\"' + 'y' * 150
+        longNumber = '1234567890' * 20
+        docs = [
+            '{"a": 1, "b": [1, 2, 1, [3, 3], [3, 3]], "a": {"c": [true, false, true]}}',
+            '{"a": {"b": [{"c": 1}, {"c": 1}], "b": null}, "a": [[1, [2, 2]], "%s"]}' % longText,
+            '{"%s": %s, "k": "%s", "%s": "%s", "k": [%s, %s]}' % (
+                'key' * 30, longNumber, longText, 'key' * 30, longText, longNumber, longNumber),
+            '{"a": [[[1, 1], [1, 1]], [[1, 1], [1, 1]]], "a": [[2]], "n": null, "n": true}',
+        ]
+        with open(os.path.join(HERE, 'test.json')) as f:
+            docs.append(f.read())
+        for chunkSize in (1, 7, 64):
+            self.check(docs, chunkSize=chunkSize)
+
+if __name__ == "__main__":
+    unittest.main()
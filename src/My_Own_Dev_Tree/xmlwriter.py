@@ -0,0 +1,132 @@
+# Output backends for the XML converters.
+#
+# convertToXML() and streamToXML() only ever call write() with small pieces
+# of text. The writers below collect those pieces in a list and join them
+# once, either at the end (StringWriter) or whenever CHUNK_SIZE characters
+# have piled up (FileWriter, CallbackWriter), so the output never has to be
+# built up with repeated string concatenation.
+
+import re
+
+CHUNK_SIZE = 1 << 16
+
+# The layout produced by the converters is the one minidom's toprettyxml()
+# used to produce: one element per line, indented by its depth, with text
+# kept inline and empty elements collapsed to <tag/>. Passing indent=None
+# gives the compact form instead (everything on one line, as toxml()).
+DEFAULT_INDENT = '\t'
+
+def newlineFor(indent):
+    return '' if indent is None else '\n'
+
+def escapeText(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+# The Name production of the XML spec (https://www.w3.org/TR/xml/#NT-Name)
+_NAME_START = (':A-Z_a-z\xC0-\xD6\xD8-\xF6\xF8-\u02FF\u0370-\u037D\u037F-\u1FFF'
+               '\u200C-\u200D\u2070-\u218F\u2C00-\u2FEF\u3001-\uD7FF\uF900-\uFDCF'
+               '\uFDF0-\uFFFD\U00010000-\U000EFFFF')
+_NAME_CHAR = _NAME_START + '\\-.0-9\xB7\u0300-\u036F\u203F-\u2040'
+_isName = re.compile('[%s][%s]*' % (_NAME_START, _NAME_CHAR)).fullmatch
+
+# The name a key is written with as a tag. Keys are used as they are, so a
+# key that is not an XML name (e.g. "first name", "1st" or "a<b") can't be
+# written and raises ValueError. None is the tag of the items of nested
+# arrays.
+def tagName(key):
+    name = str(key)
+    if not _isName(name):
+        raise ValueError(f"Key {name!r} is not a valid XML tag name")
+    return name
+
+# The markup around the elements with one tag at one depth: a tuple of the
+# opening line, the closing line, the start and the end of a leaf with text,
+# and the line of an empty leaf. tags[level][tag] makes them the first time
+# they are looked up, which is also when the key is checked by tagName(). A
+# document only has a handful of distinct keys, so the converters put their
+# elements together from these instead of formatting the tag into every
+# element.
+class TagCache(dict):
+    def __init__(self, indent):
+        self.pad = indent or ''
+        self.newl = newlineFor(indent)
+
+    def __missing__(self, level):
+        tags = self[level] = _LevelTags(self.pad * level, self.newl)
+        return tags
+
+    def leaf(self, tag, level, text):
+        fragments = self[level][tag]
+        if text == '':
+            return fragments[4]
+        return fragments[2] + escapeText(text) + fragments[3]
+
+class _LevelTags(dict):
+    def __init__(self, pad, newl):
+        self.pad = pad
+        self.newl = newl
+
+    def __missing__(self, tag):
+        name = tagName(tag)
+        pad = self.pad
+        newl = self.newl
+        fragments = self[tag] = (f"{pad}<{name}>{newl}", f"{pad}</{name}>{newl}",
+                                 f"{pad}<{name}>", f"</{name}>{newl}", f"{pad}<{name}/>{newl}")
+        return fragments
+
+# What the writers below have in common. Each of them provides its own
+# write(text); the converters only rely on that method being there.
+class XMLWriter:
+    def flush(self):
+        pass
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+# Keeps the whole document in memory
+class StringWriter(XMLWriter):
+    def __init__(self):
+        self.parts = []
+        self.write = self.parts.append
+
+    def getvalue(self):
+        value = ''.join(self.parts)
+        self.parts[:] = [value]
+        return value
+
+# Hands the output to callback(chunk) in chunks of about chunkSize characters
+class CallbackWriter(XMLWriter):
+    def __init__(self, callback, chunkSize=CHUNK_SIZE):
+        self.callback = callback
+        self.chunkSize = chunkSize
+        self.parts = []
+        self.size = 0
+
+    def write(self, text):
+        self.parts.append(text)
+        self.size += len(text)
+        if self.size >= self.chunkSize:
+            self.flush()
+
+    def flush(self):
+        if self.parts:
+            self.callback(''.join(self.parts))
+            self.parts.clear()
+            self.size = 0
+
+# Writes straight to an open file (or anything else with a write() method,
+# such as socket.makefile('w'))
+class FileWriter(CallbackWriter):
+    def __init__(self, f, chunkSize=CHUNK_SIZE):
+        super().__init__(f.write, chunkSize)
+        self.f = f
+
+    def flush(self):
+        super().flush()
+        self.f.flush()